@@ -4,7 +4,7 @@
 
 __author__ = 'Jay Taylor [@jtaylor]'
 
-import logging, settings
+import logging, Queue, settings, sys, threading
 
 
 DEBUG = False
@@ -33,3 +33,92 @@ def rollback(using):
     """Commit a transaction."""
     return db_exec('ROLLBACK', using=using)
 
+
+
+# Long-lived worker threads for `db_parallel()`, one per connection name, mapped to their task queues.
+_parallelWorkers = {}
+_parallelWorkersLock = threading.Lock()
+
+
+def _parallelWorkerQueue(using):
+    """
+    Get (or start) the worker thread dedicated to a connection name.  The worker's thread-local connection handle stays
+    open between calls, so `db_parallel()` doesn't pay to reconnect each time.
+
+    @return Queue.Queue of (fn, args, kw, outcome, done) tasks for the worker.
+    """
+    with _parallelWorkersLock:
+        if using not in _parallelWorkers:
+            tasks = Queue.Queue()
+
+            def work():
+                """Thread target."""
+                while True:
+                    fn, args, kw, outcome, done = tasks.get()
+                    try:
+                        outcome.append((fn(*args, **kw), None))
+                        # Don't leave a transaction (and its snapshot) open on the idle handle.
+                        if isInTransaction(using):
+                            rollback(using)
+                    except Exception:
+                        if len(outcome) == 0:
+                            outcome.append((None, sys.exc_info()))
+                        # Start over with a fresh handle rather than reuse one in an unknown state.
+                        try:
+                            closeConnection(using)
+                        except Exception:
+                            logging.exception(u'db_parallel worker for {0} failed to close its connection'.format(using))
+                    finally:
+                        done.set()
+
+            worker = threading.Thread(target=work, name='db_parallel[{0}]'.format(using))
+            worker.daemon = True
+            worker.start()
+            _parallelWorkers[using] = tasks
+
+        return _parallelWorkers[using]
+
+
+def db_parallel(*calls):
+    """
+    Run database calls concurrently and return their results in the same order.
+
+    Each call runs on the long-lived worker thread for its connection name (so calls sharing a connection name run one
+    after another), using the worker's own thread-local connection handle.  Only use this for work which does not need
+    to share a transaction with the invoker, e.g. reads against different shards.
+
+    @param *calls Tuples of (fn, args, kw), where kw must include the `using` connection name.
+
+    @return list of results.
+    """
+    return db_parallel_async(*calls)()
+
+
+def db_parallel_async(*calls):
+    """
+    Start database calls the same way as `db_parallel()`, but without waiting for them, so that the invoker can do
+    other work (e.g. inside its own transaction) in the meantime.
+
+    @param *calls Tuples of (fn, args, kw), where kw must include the `using` connection name.
+
+    @return function which waits for the calls to finish and returns the list of results (re-raising any error).
+    """
+    pending = []
+
+    for fn, args, kw in calls:
+        outcome, done = [], threading.Event()
+        _parallelWorkerQueue(kw['using']).put((fn, args, kw, outcome, done))
+        pending.append((outcome, done))
+
+    def wait():
+        for _, done in pending:
+            done.wait()
+
+        for outcome, _ in pending:
+            error = outcome[0][1]
+            if error is not None:
+                raise error[0], error[1], error[2]
+
+        return [outcome[0][0] for outcome, _ in pending]
+
+    return wait
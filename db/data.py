@@ -13,18 +13,16 @@ resolves to truthy for str.isdigit().
 
 __author__ = 'Jay Taylor [@jtaylor]'
 
-import simplejson as json, re, settings, time
+import simplejson as json, hashlib, os, re, settings, sys, tempfile, threading, time
 import logging
-from collections import OrderedDict
-from ..functional import memoize
+from collections import deque, OrderedDict
+from ..functional import memoize, memoizeWithExpiry
 from ..sharding import ShardedResource, coerceIdToShardName, ShardEvent
 from ..memcache import attemptMemcacheFlush
 from ..s3 import uploadFile
-from . import db_exec, db_query, connections, getPsqlConnectionString
-from .reflect import describe, discoverDependencies, findTablesWithUserIdColumn, getPrimaryKeyColumns, updatePrimaryKeyId
-from .distributed import tableDescriptionToDbLinkT
-# NB: Don't use cStringIO because it is unable to work with UTF-8.
-from StringIO import StringIO
+from . import closeConnection, db_copy, db_exec, db_exec_raw, db_parallel, db_parallel_async, db_query, connections, getPsqlConnectionString, isInTransaction
+from .reflect import allTableRelations, clearReflectionCache, describe, discoverDependencies, findTablesWithUserIdColumn, getPrimaryKeyColumns, updatePrimaryKeyId
+from .distributed import _analyzeDistributedSelect, tableDescriptionToDbLinkT
 
 
 # Logical shard S3 backup path.
@@ -35,6 +33,10 @@ def _baseBackupFileName(logicalShardId, ts):
     return '{0}/id-{1}_{2}'.format(s3MigrationBackupPath, logicalShardId, int(ts))
 
 
+# Per-user row count summary table, maintained by triggers installed with `installUserRowCountSummary()`.
+userRowCountSummaryTable = 'shard_user_row_counts'
+
+
 # Used to cleanup SQL queries sometimes (not always guaranteed to be safe
 # WRT messing up your SQL query, discretion required).
 _spacesRe = re.compile(r'\s+', re.M)
@@ -49,49 +51,145 @@ class MigrateUserStaleReadError(MigrateUserError):
     """Stale-data read error."""
 
 
+# Plain module-level cache for `_ignoredTables()`: it is consulted once per table, where `@memoize`'s pickling of the
+# arguments and deep-copying of the result would cost more than the membership test itself.
+_ignoredTablesCache = None
+
+
+def _ignoredTables():
+    """
+    @return frozenset of the tables which user-specific data does not live in.  Look this up once and test membership
+        directly when checking many tables, rather than calling `shouldTableBeIgnoredForUserOperations()` for each one.
+    """
+    global _ignoredTablesCache
+    if _ignoredTablesCache is None:
+        _ignoredTablesCache = frozenset(settings.STATIC_TABLES) | frozenset(settings.SHARDING_IGNORE_TABLES) | \
+            frozenset([userRowCountSummaryTable])
+    return _ignoredTablesCache
+
+
 def shouldTableBeIgnoredForUserOperations(table):
     """@return True if user-specific data does not live in specified table, otherwise False."""
-    return table in settings.STATIC_TABLES or table in settings.SHARDING_IGNORE_TABLES
+    return table in (_ignoredTablesCache if _ignoredTablesCache is not None else _ignoredTables())
 
 
-def doesTheTableDataDiffer(table, source1, source2):
+def clearSchemaCaches():
     """
-    Determine if the table data differs across hosts (shards).
+    Forget all memoized reflection results along with everything derived from them here (dependency orderings, delete
+    plans, etc).  Invoke after DDL.
+    """
+    global _ignoredTablesCache
+    _ignoredTablesCache = None
 
-    NB: Hardcoded not to work on tables with more than 100,000 rows.  This should never be used for tables that may grow
-    to that size (or even close to that).
+    clearReflectionCache()
 
-    @return True if the data differs between source1 and source2, otherwise False.
-    """
-    countSql = 'SELECT COUNT(*) FROM "{0}"'.format(table)
+    for fn in (
+        _analyzeDistributedSelect,
+        _replicationBits,
+        _userIdTableColumnPairs,
+        _userIdTables,
+        _tableDependencyOrder,
+        _deletePlan,
+        _fusedDeleteSql,
+        _rowChecksumUnionSql,
+    ):
+        fn.clear()
 
-    count1 = db_query(countSql, using=source1)[0][0]
-    count2 = db_query(countSql, using=source2)[0][0]
 
-    # NEVER USE THIS ON TABLES WITH MORE THAN 100,000 ROWS!
-    assert count1 < 100001 and count2 < 100001
+# Number of seconds a replication source's static table digest may be reused for (see `doesTheTableDataDiffer()`).
+STATIC_TABLE_DIGEST_TTL_SECONDS = 300
 
-    if count1 != count2:
-        return True
 
+def _tableDigest(table, using):
+    """
+    Reduce a table to its row count and a single md5 over the per-row hashes (in primary key order), so only those
+    two values cross the wire regardless of the table size.
+
+    @return tuple of (row count, digest).
+    """
     # Dynamically lookup PK and generate order clause.
     orderBy = ', '.join(map(
-        '"{0}"'.format,
-        getPrimaryKeyColumns(table, source1)
+        't."{0}"'.format,
+        getPrimaryKeyColumns(table, using)
     ))
 
-    dataSql = 'SELECT * FROM "{0}" ORDER BY {1} DESC'.format(table, orderBy)
+    digestSql = '''SELECT COUNT(*), md5(string_agg(md5(t::text), '' ORDER BY {1})) FROM "{0}" t'''.format(table, orderBy)
+
+    return tuple(db_query(digestSql, using=using)[0])
+
+
+# So that replicating a static table out to every shard only hashes the source once.
+_cachedTableDigest = memoizeWithExpiry(STATIC_TABLE_DIGEST_TTL_SECONDS)(_tableDigest)
+
+
+def doesTheTableDataDiffer(table, source1, source2, **kw):
+    """
+    Determine if the table data differs across hosts (shards), by comparing digests of the table computed on both
+    hosts concurrently.
+
+    @param **kw:
+        ``cacheSource1`` bool Defaults to False.  Whether or not source1's digest may be reused for up to
+            `STATIC_TABLE_DIGEST_TTL_SECONDS`, e.g. for a static table's replication source.
+
+    @return True if the data differs between source1 and source2, otherwise False.
+    """
+    source1Digest = _cachedTableDigest if kw.get('cacheSource1', False) is True else _tableDigest
+
+    digest1, digest2 = db_parallel(
+        (lambda using: source1Digest(table, using), (), {'using': source1}),
+        (lambda using: _tableDigest(table, using), (), {'using': source2})
+    )
+
+    return digest1 != digest2
+
+
+def _streamTableCopy(table, columns, source, destination):
+    """
+    Stream a table's rows from the source connection into the destination connection with binary COPY, without ever
+    materializing the full data set.  The source side runs on its own thread (and connection handle), writing into a
+    pipe which the destination consumes from as the data is produced.
+
+    NB: Binary COPY requires the column types to match exactly on both sides.
 
-    data1 = db_query(dataSql, using=source1)
-    data2 = db_query(dataSql, using=source2)
+    @param table str Table name.
+    @param columns list of quoted column names.
+    @param source str Source connection name.
+    @param destination str Destination connection name.
+    """
+    columnsSql = ', '.join(columns)
+    readFd, writeFd = os.pipe()
+    reader, writer = os.fdopen(readFd, 'rb'), os.fdopen(writeFd, 'wb')
+    errors = []
+
+    def produce():
+        """Thread target."""
+        try:
+            db_copy('COPY "{0}" ({1}) TO STDOUT WITH BINARY'.format(table, columnsSql), writer, using=source)
+        except Exception:
+            errors.append(sys.exc_info())
+        finally:
+            writer.close()
+            closeConnection(source)
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+
+    try:
+        db_copy('COPY "{0}" ({1}) FROM STDIN WITH BINARY'.format(table, columnsSql), reader, using=destination)
+    finally:
+        # Unblocks the producer if the destination bailed out early.
+        reader.close()
+        producer.join()
 
-    return data1 != data2
+    # NB: Binary COPY treats EOF at a row boundary as the end of the data, so a partial stream could otherwise pass.
+    for error in errors:
+        raise error[0], error[1], error[2]
 
 
 def replicateTable(table, source, destination):
     """
-    Replicate a static table from one database connection to another.  The destination table will pull the data
-    directly from the source db's table.
+    Replicate a static table from one database connection to another.  The rows are streamed straight from the source
+    into the destination with binary COPY.
 
     @param table str Table name.
     @param source str Source connection name.
@@ -105,33 +203,14 @@ def replicateTable(table, source, destination):
 
     # Check to see if the table data matches in both locations.
     # If it does, then no further work is required.
-    differ = doesTheTableDataDiffer(table, source, destination)
+    differ = doesTheTableDataDiffer(table, source, destination, cacheSource1=True)
     if not differ:
         return
 
-    logging.info(u'Replicating table {0} from {1} -> {2}'.format(table, source, destination))
+    logging.info(u'Replicating table %s from %s -> %s', table, source, destination)
 
     # Let the refresh begin!
-    connectionString = getPsqlConnectionString(source)
-
-    description = describe(table, using=destination)
-
-    columns = map(lambda d: '"{0}"'.format(d[0]), description)
-
-    dbLinkT = tableDescriptionToDbLinkT(description)
-
-    sql = '''
-        INSERT INTO "{table}" ({columns}) SELECT {columns} FROM dblink(
-            '{connectionString}',
-            'SELECT {columns} FROM "{table}"'
-        ) AS {dbLinkT}
-    '''.format(
-        table=table,
-        columns=', '.join(columns),
-        connectionString=connectionString,
-        dbLinkT=dbLinkT
-    )
-    #print sql
+    columns, _ = _replicationBits(table, destination)
 
     try:
         db_exec('BEGIN', using=destination)
@@ -139,7 +218,7 @@ def replicateTable(table, source, destination):
         # NB: Truncate wouldn't work here, because TRUNCATE is a DDL statement.
         # @see
         db_exec('DELETE FROM "{0}"'.format(table), using=destination)
-        db_exec(sql, using=destination)
+        _streamTableCopy(table, columns, source, destination)
         db_exec('COMMIT', using=destination)
 
     except Exception, e:
@@ -157,10 +236,20 @@ def replicateTable(table, source, destination):
         )
 
 
+@memoize
+def _replicationBits(table, using='default'):
+    """
+    @return tuple of (list of the table's quoted column names, str dblink "t" statement for all of its columns).
+    """
+    description = describe(table, using=using)
+    return (['"{0}"'.format(column) for column, _ in description], tableDescriptionToDbLinkT(description))
+
+
 def autoDbLinkInsert(table, dbLinkSql, sourceConnectionString, using='default', pk=None):
     """
     Automatically generate and execute the autoDb part of the SQL statement to insert a remote dataset for a
-    particular SELECT query.
+    particular SELECT query.  Rows whose primary key already exists in the destination table are skipped, in the same
+    pass.
 
     @param table str Name of table
     @param dbLinkSql str  <SELECT X FROM Y clause> for table.
@@ -168,67 +257,90 @@ def autoDbLinkInsert(table, dbLinkSql, sourceConnectionString, using='default',
     @param using str Django connection name -- should be the destination host.
     @param pk str Optional string containing the primary key column name, or None to enable auto-detection.
     """
+    db_exec(autoDbLinkInsertSql(table, toSingleLine(dbLinkSql), sourceConnectionString, using, pk), using=using)
+
+
+def autoDbLinkInsertSql(table, dbLinkSql, sourceConnectionString, using='default', pk=None):
+    """
+    Generate the statement executed by `autoDbLinkInsert()`, e.g. to send several of them in a single round-trip.
+
+    NB: Unlike `autoDbLinkInsert()`, ``dbLinkSql`` is used as-is, so it should already be on a single line (see
+    `toSingleLine()`), rather than being re-scanned along with its (possibly long) list of ids every time.
+
+    @return str SQL statement.
+    """
     if sourceConnectionString in connections():
         sourceConnectionString = getPsqlConnectionString(sourceConnectionString)
 
-    dbLinkSql = toSingleLine(dbLinkSql)
-    dbLinkT = tableDescriptionToDbLinkT(describe(table))
+    _, dbLinkT = _replicationBits(table, using)
 
-    try:
-        db_exec('SAVEPOINT auto_db_link_insert', using=using)
+    pkColumns = [pk] if pk is not None else getPrimaryKeyColumns(table, using=using)
+
+    # NB: Notice the where clause -- to avoid potential duplicates.  An anti-join rather than `NOT IN (SELECT ..)` so
+    # that each row is a single pk index probe.  A `"pk" > max("pk")` watermark wouldn't be safe: ids are handed out
+    # across all of the shards, so the rows being copied can sort below ones already present here.
+    whereClause = '''WHERE NOT EXISTS (SELECT 1 FROM "{0}" "existing" WHERE {1})'''.format(
+        table,
+        ' AND '.join('"existing"."{0}" = "t"."{0}"'.format(column) for column in pkColumns)
+    ) if len(pkColumns) > 0 else ''
 
-        sql = '''
-            INSERT INTO "{table}"
-            SELECT * FROM dblink(
-                '{connectionString}',
-                '{dbLinkSql}'
-            ) AS {dbLinkT}
-        '''.format(table=table, connectionString=sourceConnectionString, dbLinkSql=dbLinkSql, dbLinkT=dbLinkT)
+    # NB: The remote result isn't paged through by pk (LIMIT/OFFSET or a dblink cursor): dblink reads it in single-row
+    # mode into a tuplestore, which spills to disk past work_mem, so the destination backend's memory is already
+    # bounded.  Paging would only turn the one statement into a round-trip per page.
+    sql = '''
+        INSERT INTO "{table}"
+        SELECT * FROM dblink(
+            '{connectionString}',
+            '{dbLinkSql}'
+        ) AS {dbLinkT}
+        {whereClause}
+    '''.format(
+        table=table,
+        connectionString=sourceConnectionString,
+        dbLinkSql=dbLinkSql,
+        dbLinkT=dbLinkT,
+        whereClause=whereClause
+    )
 
-        db_exec(sql, using=using)
-        db_exec('RELEASE SAVEPOINT auto_db_link_insert', using=using)
+    return sql
 
-    except Exception, e:
-        excStr = str(e)
-
-        if 'duplicate key value violates unique constraint' in excStr:
-            logging.warn(u'Naiive autoDbLinkInsert failed, attempting again with pk exclusion..')
-            logging.warn(u'Exception was: {0}/{1}'.format(type(e), e))
-
-            db_exec('ROLLBACK TO auto_db_link_insert', using=using)
-            db_exec('SAVEPOINT auto_db_link_insert', using=using)
-
-            # NB: Tables with multiple column PK's are not supported.
-            pk = pk or getPrimaryKeyColumns(table, using=using)[0]
-
-            # NB: Notice the where clause -- to avoid potential duplicates.
-            sql = '''
-                INSERT INTO "{table}"
-                SELECT * FROM dblink(
-                    '{connectionString}',
-                    '{dbLinkSql}'
-                ) AS {dbLinkT}
-                WHERE "{pk}" NOT IN (SELECT "{pk}" FROM "{table}")
-            '''.format(
-                table=table,
-                connectionString=sourceConnectionString,
-                dbLinkSql=dbLinkSql,
-                dbLinkT=dbLinkT,
-                pk=pk
-            )
 
-            db_exec(sql, using=using)
-            db_exec('RELEASE SAVEPOINT auto_db_link_insert', using=using)
+# Binds the user-ids array once for every branch of the UNION ALL row count/checksum queries, referenced with
+# `= ANY((SELECT "ids" FROM "u"))` (the double parens make it a scalar array, so the index is still used).
+_userIdsCteSql = 'WITH "u" AS (SELECT CAST(%s AS bigint[]) "ids") '
 
-        else:
-            db_exec('RELEASE SAVEPOINT auto_db_link_insert', using=using)
-            raise e
+_rowCountSelectSql = '''
+    SELECT '{table}' "table", COUNT(*) "count" FROM "{table}" WHERE "{userIdColumn}" = ANY((SELECT "ids" FROM "u"))
+'''
+
+# NB: `{columns}` is an explicit column list in name order rather than the whole-row `t::text`, which follows each
+# shard's physical attnum order (a column added by a migration on one shard and restored by pg_dump on another lands
+# in a different position, giving a different text for the same row).
+_rowChecksumSelectSql = '''
+    SELECT '{table}' "table", COUNT(*) "count", COALESCE(SUM(hashtext(ROW({columns})::text)::bigint), 0) "checksum"
+    FROM "{table}" t WHERE t."{userIdColumn}" = ANY((SELECT "ids" FROM "u"))
+'''
+
+
+@memoize
+def _userIdsUnionSql(tableColumnPairs, selectSql):
+    """
+    Generate the UNION ALL of ``selectSql`` (formatted with each non-ignored table/userIdColumn) over the user-ids CTE.
+    Only depends on the tables, so is only generated once for each set of tables.
+    """
+    selects = [
+        toSingleLine(selectSql.format(table=table.strip('"').strip("'"), userIdColumn=column.strip('"')))
+        for table, column in tableColumnPairs
+        if not shouldTableBeIgnoredForUserOperations(table)
+    ]
+
+    return _userIdsCteSql + ' UNION ALL '.join(selects)
 
 
 def tableRowCounts(tableColumnPairs, userIdOrUserIds, using):
     """
-    Get counts for each table with the user-id filter applied.  Executes a single query to get the results as
-    list((table, count)).
+    Get counts for each table with the user-id filter applied.  Executes a single UNION ALL query to get the results
+    as list((table, count)).
 
     @param tableColumnPairs list of tuples of table/column pairs (where the column contains the user id).
     @param userIdOrUserIds mixed int user-id or list of user-ids.
@@ -236,26 +348,199 @@ def tableRowCounts(tableColumnPairs, userIdOrUserIds, using):
 
     @return dict of table -> matching row count
     """
-    # True if userIdOrUserIds is an iterable, otherwise False.
-    isIterable = isinstance(userIdOrUserIds, (set, list))
+    userIds = map(int, userIdOrUserIds) if isinstance(userIdOrUserIds, (set, list)) else [int(userIdOrUserIds)]
 
-    sql = ' UNION '.join(map(
-        lambda (table, column): toSingleLine(
-            '''
-                SELECT '{table}' "table", COUNT(*) "count"
-                FROM "{table}"
-                WHERE "{userIdColumn}" {op} {idOrIds}
-            '''.format(
-                table=table.strip('"').strip("'"),
-                userIdColumn=column.strip('"'),
-                op='IN' if isIterable else '=',
-                idOrIds='({0})'.format(','.join(map(str, userIdOrUserIds)) if isIterable else int(userIdOrUserIds))
+    # The SQL text only depends on the tables, and the user-ids array is only sent once.
+    return dict(db_query(_userIdsUnionSql(tableColumnPairs, _rowCountSelectSql), (userIds,), using=using))
+
+
+def tableRowChecksums(tableColumnPairs, userIdOrUserIds, using):
+    """
+    Like `tableRowCounts()`, but also sums a hash of every matching row, so that rows which were changed (and not just
+    added or removed) are detected as well.  Executes a single UNION ALL query.
+
+    @param tableColumnPairs list of tuples of table/column pairs (where the column contains the user id).
+    @param userIdOrUserIds mixed int user-id or list of user-ids.
+    @param using str Connection name.
+
+    @return dict of table -> (matching row count, row hash sum)
+    """
+    userIds = map(int, userIdOrUserIds) if isinstance(userIdOrUserIds, (set, list)) else [int(userIdOrUserIds)]
+
+    rows = db_query(_rowChecksumUnionSql(tableColumnPairs, using), (userIds,), using=using)
+    return dict((table, (count, checksum)) for table, count, checksum in rows)
+
+
+@memoize
+def _rowChecksumUnionSql(tableColumnPairs, using):
+    """
+    Generate the `tableRowChecksums()` UNION ALL, hashing each table's columns in name order (see
+    `_rowChecksumSelectSql`).
+    """
+    selects = []
+    for table, column in tableColumnPairs:
+        table = table.strip('"').strip("'")
+        if shouldTableBeIgnoredForUserOperations(table):
+            continue
+        columns = ', '.join('t."{0}"'.format(name) for name in sorted(row[0] for row in describe(table, using=using)))
+        selects.append(toSingleLine(_rowChecksumSelectSql.format(table=table, userIdColumn=column.strip('"'), columns=columns)))
+
+    return _userIdsCteSql + ' UNION ALL '.join(selects)
+
+
+_userRowCountSummaryFunctionSql = '''
+    CREATE OR REPLACE FUNCTION "fn_shard_user_row_counts"() RETURNS TRIGGER AS $$
+    DECLARE
+        old_user_id bigint;
+        new_user_id bigint;
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            EXECUTE 'SELECT ($1).' || quote_ident(TG_ARGV[0]) INTO old_user_id USING OLD;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            EXECUTE 'SELECT ($1).' || quote_ident(TG_ARGV[0]) INTO new_user_id USING NEW;
+        END IF;
+        IF old_user_id IS NOT DISTINCT FROM new_user_id THEN
+            RETURN NULL;
+        END IF;
+        IF old_user_id IS NOT NULL THEN
+            UPDATE "shard_user_row_counts" SET "count" = "count" - 1 WHERE "ctid" = (
+                SELECT "ctid" FROM "shard_user_row_counts"
+                WHERE "user_id" = old_user_id AND "table_name" = TG_TABLE_NAME
+                LIMIT 1
+            );
+            IF NOT FOUND THEN
+                INSERT INTO "shard_user_row_counts" ("user_id", "table_name", "count")
+                VALUES (old_user_id, TG_TABLE_NAME, -1);
+            END IF;
+        END IF;
+        IF new_user_id IS NOT NULL THEN
+            UPDATE "shard_user_row_counts" SET "count" = "count" + 1 WHERE "ctid" = (
+                SELECT "ctid" FROM "shard_user_row_counts"
+                WHERE "user_id" = new_user_id AND "table_name" = TG_TABLE_NAME
+                LIMIT 1
+            );
+            IF NOT FOUND THEN
+                INSERT INTO "shard_user_row_counts" ("user_id", "table_name", "count")
+                VALUES (new_user_id, TG_TABLE_NAME, 1);
+            END IF;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+'''
+
+
+def installUserRowCountSummary(using):
+    """
+    (Re)build the per-user row count summary table on a shard, and install the triggers which keep it up to date for
+    every table with a user-id column.
+
+    NB: Concurrent inserts of the first row for a (user, table) pair may produce more than one summary row; readers
+    must always SUM() the counts.  TRUNCATE is not tracked, re-run this after truncating any user-id table.
+
+    @param using str Connection name.
+    """
+    tableColumnPairs = [
+        (table, column) for table, column in _userIdTableColumnPairs()
+        if not shouldTableBeIgnoredForUserOperations(table)
+    ]
+
+    db_exec('BEGIN', using=using)
+
+    try:
+        db_exec('DROP TABLE IF EXISTS "{0}"'.format(userRowCountSummaryTable), using=using)
+        db_exec(
+            '''CREATE TABLE "{0}" ("user_id" bigint NOT NULL, "table_name" text NOT NULL, "count" bigint NOT NULL)'''
+                .format(userRowCountSummaryTable),
+            using=using
+        )
+        db_exec(
+            '''CREATE INDEX "{0}_user_id_table_name" ON "{0}" ("user_id", "table_name")'''
+                .format(userRowCountSummaryTable),
+            using=using
+        )
+        db_exec(toSingleLine(_userRowCountSummaryFunctionSql), using=using)
+
+        for table, column in tableColumnPairs:
+            # NB: Creating the trigger locks out writers until COMMIT, so the seeded counts can't go stale.
+            db_exec('''DROP TRIGGER IF EXISTS "shard_user_row_counts_trigger" ON "{0}"'''.format(table), using=using)
+            db_exec(
+                toSingleLine(
+                    '''
+                        CREATE TRIGGER "shard_user_row_counts_trigger"
+                        AFTER INSERT OR UPDATE OR DELETE ON "{table}"
+                        FOR EACH ROW EXECUTE PROCEDURE "fn_shard_user_row_counts"('{column}')
+                    '''.format(table=table, column=column)
+                ),
+                using=using
             )
-        ),
-        filter(lambda (table, column): not shouldTableBeIgnoredForUserOperations(table), tableColumnPairs)
-    ))
+            # Keep counting even while deleteUsers runs with session_replication_role = replica.
+            db_exec(
+                '''ALTER TABLE "{0}" ENABLE ALWAYS TRIGGER "shard_user_row_counts_trigger"'''.format(table),
+                using=using
+            )
+            db_exec(
+                toSingleLine(
+                    '''
+                        INSERT INTO "{summaryTable}" ("user_id", "table_name", "count")
+                        SELECT "{column}", '{table}', COUNT(*) FROM "{table}"
+                        WHERE "{column}" IS NOT NULL
+                        GROUP BY "{column}"
+                    '''.format(summaryTable=userRowCountSummaryTable, table=table, column=column)
+                ),
+                using=using
+            )
+
+        db_exec('COMMIT', using=using)
+
+    except Exception:
+        db_exec('ROLLBACK', using=using)
+        raise
+
+    # The summary table has been (re)created, forget anything reflected before it.
+    clearSchemaCaches()
+
+
+def summaryTableRowCounts(tableColumnPairs, userIdOrUserIds, using):
+    """
+    Drop-in replacement for `tableRowCounts()` which reads the trigger-maintained summary table instead of scanning
+    every user-id table.  Requires `installUserRowCountSummary()` to have been run on the connection.
+
+    @return dict of table -> matching row count
+    """
+    userIds = map(int, userIdOrUserIds) if isinstance(userIdOrUserIds, (set, list)) else [int(userIdOrUserIds)]
+
+    ignoredTables = _ignoredTables()
+    tables = [
+        table.strip('"').strip("'") for table, column in tableColumnPairs
+        if table not in ignoredTables
+    ]
 
-    return dict(db_query(sql, using=using))
+    rows = db_query(
+        '''
+        SELECT "table_name", SUM("count") FROM "{0}"
+        WHERE "user_id" = ANY(%s) AND "table_name" = ANY(%s)
+        GROUP BY "table_name"
+        '''.format(userRowCountSummaryTable),
+        (userIds, tables),
+        using=using
+    )
+
+    counts = dict.fromkeys(tables, 0)
+    counts.update((table, int(count)) for table, count in rows)
+    return counts
+
+
+def _rowCountsFn():
+    """
+    @return the row verification function selected by the SH_UTIL_USE_ROW_CHECKSUMS and SH_UTIL_USE_ROW_COUNT_SUMMARY
+        settings.
+    """
+    if getattr(settings, 'SH_UTIL_USE_ROW_CHECKSUMS', False):
+        return tableRowChecksums
+
+    return summaryTableRowCounts if getattr(settings, 'SH_UTIL_USE_ROW_COUNT_SUMMARY', False) else tableRowCounts
 
 
 def scrubTables(using):
@@ -276,36 +561,35 @@ def scrubTables(using):
         db_exec(statement, using=using)
 
 
+def _primaryShardUpdate(sql, args):
+    """
+    Execute a single (atomic) statement against the primary shard and make sure it's committed.  Under autocommit the
+    statement already committed itself, otherwise one COMMIT follows -- no explicit BEGIN round-trip either way.
+    """
+    db_exec(sql, args, using=settings.PRIMARY_SHARD_CONNECTION)
+
+    if isInTransaction(settings.PRIMARY_SHARD_CONNECTION):
+        db_exec('''COMMIT''', using=settings.PRIMARY_SHARD_CONNECTION)
+
+
 def setLogicalShardStatus(logicalShardId, status):
     """Set the status field for a logical shard."""
-    db_exec('''BEGIN''', using=settings.PRIMARY_SHARD_CONNECTION)
-    db_exec(
-        '''UPDATE "LogicalShard" SET "status" = %s WHERE "id" = %s''',
-        (status, logicalShardId),
-        using=settings.PRIMARY_SHARD_CONNECTION
-    )
-    db_exec('''COMMIT''', using=settings.PRIMARY_SHARD_CONNECTION)
+    _primaryShardUpdate('''UPDATE "LogicalShard" SET "status" = %s WHERE "id" = %s''', (status, logicalShardId))
 
 
 def setLogicalShardPhysicalShardId(logicalShardId, physicalShardId, status=None):
     """Set a new physicalShardId for a logical shard."""
-    db_exec('''BEGIN''', using=settings.PRIMARY_SHARD_CONNECTION)
-
     if status is None:
-        db_exec(
+        _primaryShardUpdate(
             '''UPDATE "LogicalShard" SET "physicalShardId" = %s WHERE "id" = %s''',
-            (physicalShardId, logicalShardId),
-            using=settings.PRIMARY_SHARD_CONNECTION
+            (physicalShardId, logicalShardId)
         )
     else:
-        db_exec(
+        _primaryShardUpdate(
             '''UPDATE "LogicalShard" SET "physicalShardId" = %s, "status" = %s WHERE "id" = %s''',
-            (physicalShardId, status, logicalShardId),
-            using=settings.PRIMARY_SHARD_CONNECTION
+            (physicalShardId, status, logicalShardId)
         )
 
-    db_exec('''COMMIT''', using=settings.PRIMARY_SHARD_CONNECTION)
-
 
 def _physicalShardId(logicalShardId):
     """Lookup a physical shard id for a logical shard id."""
@@ -323,15 +607,15 @@ def _logicalShardUserIds(logicalShardId, physicalShardId=None):
 
     @return list(int) of user-ids.
     """
-    res = db_query(
-        '''SELECT "id" FROM "auth_user" WHERE "id" %% %s = %s''',
+    # Aggregated server-side, so the ids arrive as a single list rather than as a row tuple apiece.
+    userIds = db_query(
+        '''SELECT array_agg("id") FROM "auth_user" WHERE "id" %% %s = %s''',
         (settings.NUM_LOGICAL_SHARDS, logicalShardId),
         using='shard_{0}'.format(physicalShardId or _physicalShardId(logicalShardId))
-    )
-
-    userIds = map(lambda tup: tup[0], res)
+    )[0][0]
 
-    return userIds
+    # NB: array_agg() of no rows is NULL.
+    return userIds or []
 
 
 def _cleanupStragglerShortLinks(connectionName):
@@ -354,8 +638,10 @@ def _cleanupStragglerShortLinks(connectionName):
 def _automaticDuplicateRecovery(logicalShardId, sourceConnectionName, destinationConnectionName):
     """To be invoked at the end of `migrateLogicalShard()` regardless of the outcome."""
     logging.info(u'_automaticDuplicateRecovery :: invoked with logicalShardId={0}, sourceConnectionName={1}, destinationConnectionName={2}'.format(logicalShardId, sourceConnectionName, destinationConnectionName))
-    db_exec('ROLLBACK', using=sourceConnectionName)
-    db_exec('ROLLBACK', using=destinationConnectionName)
+    # Only pay for the ROLLBACK round-trips when there is actually a transaction left over.
+    for connectionName in (sourceConnectionName, destinationConnectionName):
+        if isInTransaction(connectionName):
+            db_exec('ROLLBACK', using=connectionName)
     test = db_query(
         '''
         SELECT au1.id
@@ -366,18 +652,26 @@ def _automaticDuplicateRecovery(logicalShardId, sourceConnectionName, destinatio
         using=sourceConnectionName
     )
     if len(test) > 0:
-        logging.warn(u'Dupe user_ids detected, affected ids: {0}'.format(', '.join(map(lambda tup: '(user-id={0}, ls_id={1})'.format(tup[0], tup[0] % settings.NUM_LOGICAL_SHARDS), test))))
+        logging.warn(u'Dupe user_ids detected, affected ids: {0}'.format(', '.join('(user-id={0}, ls_id={1})'.format(row[0], row[0] % settings.NUM_LOGICAL_SHARDS) for row in test)))
         logging.warn(u'Logical shard migration failed, removing duplicate entries from the destination shard')
         physicalShardId = re.sub(r'[^0-9]', '', sourceConnectionName)
         assert physicalShardId.isdigit(), 'Failed to extract physicalShardId from source connection name "{0}"'.format(sourceConnectionName)
-        deleteUsers(map(lambda x: x[0], test), using=destinationConnectionName)
+        # NB: Deliberately by user-id rather than by a `"id" % NUM_LOGICAL_SHARDS` predicate: the ids are bound as a
+        # single array (an index scan per table, in bounded chunks), whereas a modulus predicate would need expression
+        # indexes on every user-id table to avoid sequential scans.
+        deleteUsers([row[0] for row in test], using=destinationConnectionName)
         _cleanupStragglerShortLinks(destinationConnectionName)
         db_exec('UPDATE "LogicalShard" SET "physicalShardId" = %s WHERE "id" = %s', (physicalShardId, logicalShardId,), using=settings.PRIMARY_SHARD_CONNECTION)
         attemptMemcacheFlush()
 
 
 def migrateLogicalShard(logicalShardId, destinationShard, **kw):
-    """Move all records for a logical shard to the specified physcial shard."""
+    """
+    Move all records for a logical shard to the specified physcial shard.
+
+    NB: The schema reflection and everything derived from it is memoized for the life of the process; after any DDL
+    not run through the helpers here, invoke `clearSchemaCaches()` before migrating.
+    """
     physicalShardId = _physicalShardId(logicalShardId)
     assert physicalShardId is not None
 
@@ -388,19 +682,30 @@ def migrateLogicalShard(logicalShardId, destinationShard, **kw):
 
     setLogicalShardStatus(logicalShardId, 'RELOCATING')
 
+    rowCounts = _rowCountsFn()
+
+    # NB: The automatic error resolvers may rewrite source rows during the copy, so a checksum taken before the copy
+    # is not a valid baseline; with checksums the initial source snapshot is plain counts and the checksums are only
+    # compared between the source and destination afterwards.
+    useChecksums = rowCounts is tableRowChecksums
+    baselineCounts = tableRowCounts if useChecksums else rowCounts
+
     try:
         # Keep track of initial counts.
-        preSourceCounts = tableRowCounts(_userIdTableColumnPairs(), userIds, using=sourceShard)
+        preSourceCounts = baselineCounts(_userIdTableColumnPairs(), userIds, using=sourceShard)
 
         #migrateUsers(userIds, sourceShard, destinationShard)
         startedTs = _dumpAndCopyLogicalShardWrapper(logicalShardId, destinationShard, sourceShard, userIds, **kw)
         duration = int(time.time() - startedTs)
 
         startedCountsTs = time.time()
-        postSourceCounts = tableRowCounts(_userIdTableColumnPairs(), userIds, using=sourceShard)
-        postDestinationCounts = tableRowCounts(_userIdTableColumnPairs(), userIds, using=destinationShard)
+        # The source and destination live on different hosts, so count both at once.
+        postSourceCounts, postDestinationCounts = db_parallel(
+            (rowCounts, (_userIdTableColumnPairs(), userIds), {'using': sourceShard}),
+            (rowCounts, (_userIdTableColumnPairs(), userIds), {'using': destinationShard}),
+        )
         finishedCountsTs = time.time()
-        logging.info(u'Tail-end src/dest counts took {0} seconds'.format(int(startedCountsTs - finishedCountsTs)))
+        logging.info(u'Tail-end src/dest counts took {0} seconds'.format(int(finishedCountsTs - startedCountsTs)))
 
         message = u'duration={0}s\nnumUsers={1}\npreSourceCounts={2}\npostSourceCounts={3}\npostDestinationCounts={4}' \
             .format(duration, len(userIds), preSourceCounts, postSourceCounts, postDestinationCounts)
@@ -408,7 +713,13 @@ def migrateLogicalShard(logicalShardId, destinationShard, **kw):
 
         baseFileName = _baseBackupFileName(logicalShardId, startedTs)
 
-        if preSourceCounts != postSourceCounts or preSourceCounts != postDestinationCounts:
+        if useChecksums:
+            postSourceRowCounts = dict((table, count) for table, (count, _) in postSourceCounts.items())
+            mismatch = preSourceCounts != postSourceRowCounts or postSourceCounts != postDestinationCounts
+        else:
+            mismatch = preSourceCounts != postSourceCounts or preSourceCounts != postDestinationCounts
+
+        if mismatch:
             logging.warn(u'FAILED: Logical shard migration failed due to count mis-match!')
             fileName = '{0}.failed'.format(baseFileName)
             logging.info(u'Deleting copied data from destination shard {0}'.format(destinationShard))
@@ -439,18 +750,28 @@ class AutomaticErrorResolver(object):
 
     NB: All AutomaticErrorResolvers must have a `.run()` method.
     """
-    def __init__(self, using, regexStr):
+    # Compiled once per class by each child and applied with `search()`, so patterns carry no leading/trailing `.*`.
+    # NB: Compile with re.DOTALL so that `.` also spans the newlines in multi-line error messages (e.g. before "DETAIL:").
+    regex = None
+
+    # Tuple of (key column, outcome) pairs from the error DETAIL line which the child can resolve, used to dispatch
+    # errors to candidate resolvers (see `_errorDetailKey()`).
+    detailKeys = ()
+
+    def __init__(self, using):
         """
         @param using str Db connection name to resolve conflict on (where data will be altered).
-        @param regexStr str Regular expression string to be used.
         """
         self.using = using
-        self.regexStr = regexStr
         self.match = None
 
-    def matches(self, exc):
-        """Determine if a particular exception matches the regular expression of this AutomaticErrorResolver."""
-        self.match = re.match(self.regexStr, str(exc).replace('\n', ' '))
+    def matches(self, message):
+        """
+        Determine if a particular exception message matches the regular expression of this AutomaticErrorResolver.
+
+        @param message str Exception message, stringified once by the caller (see `_findAutomaticErrorResolver()`).
+        """
+        self.match = self.regex.search(message)
         if not self.match:
             return False
         return True
@@ -464,9 +785,11 @@ class AutomaticErrorResolver(object):
 
 
 class DuplicateMixPanelIdResolver(AutomaticErrorResolver):
+    regex = re.compile(r'''duplicate key value violates unique constraint "main_extendeduser_mixpanelid_key".*DETAIL: *Key \(mixpanelid\)=\((.+)\) already exists\.''', re.DOTALL)
+    detailKeys = (('mixpanelid', 'already exists'),)
+
     def __init__(self, sourceShard, destinationShard):
-        regexStr = r'''.*duplicate key value violates unique constraint "main_extendeduser_mixpanelid_key".*DETAIL: *Key \(mixpanelid\)=\((.+)\) already exists\..*'''
-        super(DuplicateMixPanelIdResolver, self).__init__(destinationShard, regexStr)
+        super(DuplicateMixPanelIdResolver, self).__init__(destinationShard)
 
     def run(self):
         """Verify that the state of `destinationShard` is as expected, and if so, update the conflicting mixpanelid to something new"""
@@ -484,9 +807,11 @@ class DuplicateMixPanelIdResolver(AutomaticErrorResolver):
 
 
 class DuplicateUsernameResolver(AutomaticErrorResolver):
+    regex = re.compile(r'''duplicate key value violates unique constraint "username".*DETAIL: *Key \(username\)=\((.+)\) already exists\.''', re.DOTALL)
+    detailKeys = (('username', 'already exists'),)
+
     def __init__(self, sourceShard, destinationShard):
-        regexStr = r'''.*duplicate key value violates unique constraint "username".*DETAIL: *Key \(username\)=\((.+)\) already exists\..*'''
-        super(DuplicateUsernameResolver, self).__init__(destinationShard, regexStr)
+        super(DuplicateUsernameResolver, self).__init__(destinationShard)
 
     def run(self):
         """Handles cases where the username is something like 'openiduser12'."""
@@ -504,14 +829,46 @@ class DuplicateUsernameResolver(AutomaticErrorResolver):
 
 
 class DuplicateIdResolver(AutomaticErrorResolver):
+    regex = re.compile(r'''duplicate key value violates unique constraint "([^"]+)".*DETAIL: *Key \(id\)=\(([0-9]+)\) already exists\.''', re.DOTALL)
+    detailKeys = (('id', 'already exists'),)
+
+    # Tables whose constraint names (prefixed by the table name) can be resolved.
+    tables = frozenset((
+        'main_usermessage',
+        'main_shortlink',
+        'main_receipt',
+        'main_thread',
+        'main_phonenumber',
+        'main_userphonenumber',
+        'main_voicecall',
+        'tastypie_apikey',
+        'django_openid_auth_useropenid',
+        'main_usermessageshortcode',
+    ))
+
     def __init__(self, sourceShard, destinationShard):
-        regexStr = r'''.*duplicate key value violates unique constraint "(main_usermessage|main_shortlink|main_receipt|main_thread|main_phonenumber|main_userphonenumber|main_voicecall|tastypie_apikey|django_openid_auth_useropenid|main_usermessageshortcode).+".*DETAIL: *Key \(id\)=\(([0-9]+)\) already exists\..*'''
-        super(DuplicateIdResolver, self).__init__(destinationShard, regexStr)
+        super(DuplicateIdResolver, self).__init__(destinationShard)
+        self.table = None
+
+    def matches(self, message):
+        """Also requires the violated constraint to belong to one of the supported tables."""
+        if not super(DuplicateIdResolver, self).matches(message):
+            return False
+
+        constraint = self.match.group(1)
+        # NB: The longest prefix wins, e.g. "main_usermessageshortcode_pkey" belongs to main_usermessageshortcode.
+        candidates = [table for table in self.tables if constraint.startswith(table) and constraint != table]
+        if len(candidates) == 0:
+            self.match = None
+            return False
+
+        self.table = max(candidates, key=len)
+        return True
 
     def run(self):
         """Updates the duplicate id to a new value."""
         self.validateRunnability()
-        table = self.match.group(1)
+        table = self.table
         currentId = self.match.group(2)
         assert currentId.isdigit(), 'Extracted currentId={0}, was expecting a number'.format(currentId)
         currentId = int(currentId)
@@ -525,9 +882,11 @@ class DuplicateIdResolver(AutomaticErrorResolver):
 
 class ContactGroupsOverlapResolver(AutomaticErrorResolver):
     """Fix mis-matched contact group membership."""
+    regex = re.compile(r'''insert or update on table "main_contact_groups" violates foreign key constraint "[^"]+".*DETAIL: *Key \(group_id\)=\(([0-9]+)\) is not present in table "main_group"\.''', re.DOTALL)
+    detailKeys = (('group_id', 'is not present'),)
+
     def __init__(self, sourceShard, destinationShard):
-        regexStr = r'''.*insert or update on table "main_contact_groups" violates foreign key constraint "[^"]+".*DETAIL: *Key \(group_id\)=\(([0-9]+)\) is not present in table "main_group"\..*'''
-        super(ContactGroupsOverlapResolver, self).__init__(sourceShard, regexStr)
+        super(ContactGroupsOverlapResolver, self).__init__(sourceShard)
 
     def run(self):
         """Updates the offending contacts-groups records to remove contacts from groups where the contact's user-id differs from the group's user-id."""
@@ -558,9 +917,11 @@ class ContactGroupsOverlapResolver(AutomaticErrorResolver):
 
 class ReceiptOverlapResolver(AutomaticErrorResolver):
     """Fix mis-matched receipts."""
+    regex = re.compile(r'''insert or update on table "main_receipt" violates foreign key constraint "[^"]+".*DETAIL: *Key \((contact|group)_id\)=\(([0-9]+)\) is not present in table "main_(contact|group)"\.''', re.DOTALL)
+    detailKeys = (('contact_id', 'is not present'), ('group_id', 'is not present'))
+
     def __init__(self, sourceShard, destinationShard):
-        regexStr = r'''.*insert or update on table "main_receipt" violates foreign key constraint "[^"]+".*DETAIL: *Key \((contact|group)_id\)=\(([0-9]+)\) is not present in table "main_(contact|group)"\..*'''
-        super(ReceiptOverlapResolver, self).__init__(sourceShard, regexStr)
+        super(ReceiptOverlapResolver, self).__init__(sourceShard)
 
     def run(self):
         """Updates the offending receipt and related records to belong to the correct user-id."""
@@ -571,28 +932,19 @@ class ReceiptOverlapResolver(AutomaticErrorResolver):
         db_exec('BEGIN', using=self.using)
         # Find actual object owner's user-id.
         userId = db_query('SELECT "user_id" FROM "main_{0}" WHERE "id" = %s'.format(table), (currentId,), using=self.using)[0][0]
+        # All three updates in one statement, with the affected user messages only looked up once.
         db_exec(
             '''
-            UPDATE "main_thread"
-            SET "userId" = {userId}
-            WHERE "latestUserMessageId" IN (
-                SELECT "um"."id" FROM "main_usermessage" "um" JOIN "main_receipt" "r" ON "r"."message_id" = "um"."id" WHERE "r"."{table}_id" = {currentId}
+            WITH "ids" AS (
+                SELECT "um"."id" FROM "main_usermessage" "um" JOIN "main_receipt" "r" ON "r"."message_id" = "um"."id" WHERE "r"."{table}_id" = %s
+            ), "threads" AS (
+                UPDATE "main_thread" SET "userId" = %s WHERE "latestUserMessageId" IN (SELECT "id" FROM "ids")
+            ), "usermessages" AS (
+                UPDATE "main_usermessage" SET "user_id" = %s WHERE "id" IN (SELECT "id" FROM "ids")
             )
-            '''.format(table=table, currentId=currentId, userId=userId),
-            using=self.using
-        )
-        db_exec(
-            '''
-            UPDATE "main_usermessage"
-            SET "user_id" = {userId}
-            WHERE "id" IN (
-                SELECT "um"."id" FROM "main_usermessage" "um" JOIN "main_receipt" "r" ON "r"."message_id" = "um"."id" WHERE "r"."{table}_id" = {currentId}
-            )
-            '''.format(table=table, currentId=currentId, userId=userId),
-            using=self.using
-        )
-        db_exec(
-            '''UPDATE "main_receipt" SET "userId" = {userId} WHERE "{table}_id" = {currentId}'''.format(table=table, currentId=currentId, userId=userId),
+            UPDATE "main_receipt" SET "userId" = %s WHERE "{table}_id" = %s
+            '''.format(table=table),
+            (currentId, userId, userId, userId, currentId),
             using=self.using
         )
         logging.info(u'ReceiptOverlapResolver :: fixed mis-matched receipt for {0}_id={1}/userId={2} on connection={3}'.format(table, currentId, userId, self.using))
@@ -603,28 +955,34 @@ def _findAndValidateUserIdForThreadMembers(match, membersJson, using):
     """Given a Thread.membersJson field value, resolve the members to a single user-id."""
     contactIds, groupIds = json.loads(membersJson)
     assert len(contactIds) + len(groupIds) != 0, 'threadId={0} somehow had no members at all'.format(match.group(1))
+    # Look up the owners of both the contacts and the groups in one round-trip.
+    rows = db_query(
+        '''
+        SELECT 'c', "user_id" FROM "main_contact" WHERE "id" = ANY(%s)
+        UNION
+        SELECT 'g', "user_id" FROM "main_group" WHERE "id" = ANY(%s)
+        ''',
+        (map(int, contactIds), map(int, groupIds)),
+        using=using
+    )
+    userIdsC = [userId for source, userId in rows if source == 'c']
+    userIdsG = [userId for source, userId in rows if source == 'g']
     if len(contactIds) > 0:
-        userIdsC = db_query('''SELECT DISTINCT "user_id" FROM "main_contact" WHERE "id" IN ({0})'''.format(','.join(map(str, contactIds))), using=using)
         assert len(userIdsC) == 1, 'Expected to find a single user-id for contactIds={0}, but instead found {1}'.format(contactIds, len(userIdsC))
     if len(groupIds) > 0:
-        userIdsG = db_query('''SELECT DISTINCT "user_id" FROM "main_group" WHERE "id" IN ({0})'''.format(','.join(map(str, groupIds))), using=using)
         assert len(userIdsG) == 1, 'Expected to find a single user-id for groupIds={0}, but instead found {1}'.format(groupIds, len(userIdsG))
-    if 'userIdsC' in vars() and 'userIdsG' in vars():
-        assert userIdsC[0][0] == userIdsG[0][0], 'user-id for contacts/groups in membersJson={0} did not match: {1}, {2}'.format(membersJson, userIdsC[0], userIdsG[0])
-        return userIdsC[0][0]
-    elif 'userIdsC' in vars():
-        return userIdsC[0][0]
-    elif 'userIdsG' in vars():
-        return userIdsG[0][0]
-    else:
-        raise Exception('Failed to resolve any user-ids for membersJson={0}'.format(membersJson))
+    if len(contactIds) > 0 and len(groupIds) > 0:
+        assert userIdsC[0] == userIdsG[0], 'user-id for contacts/groups in membersJson={0} did not match: {1}, {2}'.format(membersJson, userIdsC[0], userIdsG[0])
+    return (userIdsC or userIdsG)[0]
 
 
 class ThreadOverlapResolver(AutomaticErrorResolver):
     """Fix mis-matched threads."""
+    regex = re.compile(r'''insert or update on table "main_usermessage" violates foreign key constraint "threadId_.*".*DETAIL: *Key \(threadId\)=\(([0-9]+)\) is not present in table "main_thread"\.''', re.DOTALL)
+    detailKeys = (('threadId', 'is not present'),)
+
     def __init__(self, sourceShard, destinationShard):
-        regexStr = r'''.*insert or update on table "main_usermessage" violates foreign key constraint "threadId_.*".*DETAIL: *Key \(threadId\)=\(([0-9]+)\) is not present in table "main_thread"\..*'''
-        super(ThreadOverlapResolver, self).__init__(sourceShard, regexStr)
+        super(ThreadOverlapResolver, self).__init__(sourceShard)
 
     def run(self):
         """Updates the offending threadId and associated records to reference the correct user-id."""
@@ -641,18 +999,29 @@ class ThreadOverlapResolver(AutomaticErrorResolver):
             logging.info(u'ThreadOverlapResolver :: fixed mis-matched thread for threadId={0}, nulled out latestUserMessageId on connection={1}'.format(threadId, self.using))
 
         else:
-            db_exec('''UPDATE "main_receipt" SET "userId" = %s WHERE "message_id" IN (SELECT "id" FROM "main_usermessage" WHERE "threadId" = %s)''', (userId, threadId,), using=self.using)
-            db_exec('''UPDATE "main_usermessage" SET "user_id" = %s WHERE "threadId" = %s''', (userId, threadId,), using=self.using)
-            db_exec('''UPDATE "main_thread" SET "userId" = %s WHERE "id" = %s''', (userId, threadId,), using=self.using)
+            db_exec(
+                '''
+                WITH "receipts" AS (
+                    UPDATE "main_receipt" SET "userId" = %s WHERE "message_id" IN (SELECT "id" FROM "main_usermessage" WHERE "threadId" = %s)
+                ), "usermessages" AS (
+                    UPDATE "main_usermessage" SET "user_id" = %s WHERE "threadId" = %s
+                )
+                UPDATE "main_thread" SET "userId" = %s WHERE "id" = %s
+                ''',
+                (userId, threadId, userId, threadId, userId, threadId,),
+                using=self.using
+            )
             logging.info(u'ThreadOverlapResolver :: fixed mis-matched thread for threadId={0}, incorrectUserId={1} correctUserId={2} on connection={3}'.format(threadId, incorrectUserId, userId, self.using))
         db_exec('COMMIT', using=self.using)
 
 
 class BlockMismatchResolver(AutomaticErrorResolver):
     """Fix mis-matched receipts."""
+    regex = re.compile(r'''insert or update on table "main_block" violates foreign key constraint "message_id.*".*DETAIL: *Key \(message_id\)=\(([0-9]+)\) is not present in table "main_usermessage"\.''', re.DOTALL)
+    detailKeys = (('message_id', 'is not present'),)
+
     def __init__(self, sourceShard, destinationShard):
-        regexStr = r'''.*insert or update on table "main_block" violates foreign key constraint "message_id.*".*DETAIL: *Key \(message_id\)=\(([0-9]+)\) is not present in table "main_usermessage"\..*'''
-        super(BlockMismatchResolver, self).__init__(sourceShard, regexStr)
+        super(BlockMismatchResolver, self).__init__(sourceShard)
 
     def run(self):
         """Updates the offending related block records to belong to the correct user-id."""
@@ -669,12 +1038,18 @@ class BlockMismatchResolver(AutomaticErrorResolver):
             using=self.using,
             as_dict=True
         )
+        # Look up the owners of all the blocked contacts in one round-trip.
+        contactUserIds = dict(db_query(
+            '''SELECT "id", "user_id" FROM "main_contact" WHERE "id" = ANY(%s)''',
+            ([block['contact_id'] for block in blocks],),
+            using=self.using
+        ))
         for block in blocks:
             # Require that the blocked user-id matches the contact user-id.
-            contactUserId = db_query('''SELECT "user_id" FROM "main_contact" WHERE "id" = %s''', (block['contact_id'],), using=self.using)[0][0]
+            contactUserId = contactUserIds.get(block['contact_id'])
             assert block['blocked_user_id'] == contactUserId, \
                 'Bad block with id={0}, blocked_user_id={1} but contactId={2} user-id was {3}'.format(block['id'], block['blocked_user_id'], block['contact_id'], contactUserId)
-            userMessageIds.append(str(block['message_id']))
+            userMessageIds.append(int(block['message_id']))
             if userId is None:
                 userId = block['blocked_user_id']
 
@@ -682,11 +1057,17 @@ class BlockMismatchResolver(AutomaticErrorResolver):
             logging.warn(u'BlockMismatchResolver :: Unexpectedly failed to find block(s) for user with block originating from message_id={0}'.format(userMessageId))
             return
 
-        db_exec('''UPDATE "main_usermessage" SET "user_id" = %s WHERE "id" IN ({0})'''.format(','.join(userMessageIds)), (userId,), using=self.using)
-        db_exec('''UPDATE "main_receipt" SET "userId" = %s WHERE "id" IN ({0})'''.format(','.join(userMessageIds)), (userId,), using=self.using)
+        # All three updates in one statement, with the affected threads taken from the updated user messages.
         db_exec(
-            '''UPDATE "main_thread" SET "userId" = %s WHERE "id" IN (SELECT "threadId" FROM "main_usermessage" WHERE "id" IN ({0}))'''.format(','.join(userMessageIds)),
-            (userId,),
+            '''
+            WITH "usermessages" AS (
+                UPDATE "main_usermessage" SET "user_id" = %s WHERE "id" = ANY(%s) RETURNING "threadId"
+            ), "receipts" AS (
+                UPDATE "main_receipt" SET "userId" = %s WHERE "id" = ANY(%s)
+            )
+            UPDATE "main_thread" SET "userId" = %s WHERE "id" IN (SELECT "threadId" FROM "usermessages")
+            ''',
+            (userId, userMessageIds, userId, userMessageIds, userId,),
             using=self.using
         )
         logging.info(u'BlockMismatchResolver :: fixed mis-matched block records for userMessageId={0}/userId={1} on connection={2}'.format(userMessageId, userId, self.using))
@@ -695,9 +1076,11 @@ class BlockMismatchResolver(AutomaticErrorResolver):
 
 class ThreadMismatchResolver(AutomaticErrorResolver):
     """Fix mis-matched threads."""
+    regex = re.compile(r'''insert or update on table "main_thread" violates foreign key constraint "latestUserMessageId_.*".*DETAIL: +Key \(latestUserMessageId\)=\(([0-9]+)\) is not present in table "main_usermessage"\.''', re.DOTALL)
+    detailKeys = (('latestUserMessageId', 'is not present'),)
+
     def __init__(self, sourceShard, destinationShard):
-        regexStr = r'''.*insert or update on table "main_thread" violates foreign key constraint "latestUserMessageId_.*".*DETAIL: +Key \(latestUserMessageId\)=\(([0-9]+)\) is not present in table "main_usermessage"\..*'''
-        super(ThreadMismatchResolver, self).__init__(sourceShard, regexStr)
+        super(ThreadMismatchResolver, self).__init__(sourceShard)
 
     def run(self):
         """Updates the offending related block records to belong to the correct user-id."""
@@ -712,28 +1095,30 @@ class ThreadMismatchResolver(AutomaticErrorResolver):
 
         db_exec('''UPDATE "main_receipt" SET "userId" = %s WHERE "message_id" = %s''', (userId, userMessageId,), using=self.using)
         db_exec('''UPDATE "main_usermessage" SET "user_id" = %s WHERE "id" = %s''', (userId, userMessageId,), using=self.using)
-        unintelligibleReceiptIds = map(lambda row: str(row[0]), db_query(
+        # Found and deleted in one statement, the ids are only brought back for logging.
+        unintelligibleReceiptIds = [row[0] for row in db_query(
             '''
-            SELECT "r"."id"
-            FROM "main_receipt" "r"
-                JOIN "main_contact" "c" ON "c"."id" = "r"."contact_id"
-            WHERE "r"."message_id" = %s AND "r"."userId" = %s AND "c"."user_id" != "r"."userId"
+            DELETE FROM "main_receipt" "r"
+            USING "main_contact" "c"
+            WHERE "c"."id" = "r"."contact_id" AND "r"."message_id" = %s AND "r"."userId" = %s AND "c"."user_id" != "r"."userId"
+            RETURNING "r"."id"
             ''',
             (userMessageId, userId,),
             using=self.using
-        ))
+        )]
         if len(unintelligibleReceiptIds) > 0:
-            logging.info(u'ThreadMismatchResolver :: found {0} unintelligible receipts, ids={0}'.format(len(unintelligibleReceiptIds), unintelligibleReceiptIds))
-            db_exec('''DELETE FROM "main_receipt" WHERE "message_id" = %s AND "id" IN ({0})'''.format(','.join(unintelligibleReceiptIds)), (userMessageId,), using=self.using)
+            logging.info(u'ThreadMismatchResolver :: deleted {0} unintelligible receipts, ids={1}'.format(len(unintelligibleReceiptIds), unintelligibleReceiptIds))
         logging.info(u'ThreadMismatchResolver :: fixed mismatched thread with lastestUserMessageId={0}/userId={1} on connection={2}'.format(userMessageId, userId, self.using))
         db_exec('COMMIT', using=self.using)
 
 
 class MismatchedContactOrGroupResolver(AutomaticErrorResolver):
     """Fix mis-matched threads."""
+    regex = re.compile(r'''insert or update on table "main_usermessage_(contact|group)s" violates foreign key constraint "main_usermessage_(?:contact|group)s_(?:contact|group)_id_fk".*DETAIL: *Key \((?:contact|group)_id\)=\(([0-9]+)\) is not present in table "main_(?:contact|group)"\.''', re.DOTALL)
+    detailKeys = (('contact_id', 'is not present'), ('group_id', 'is not present'))
+
     def __init__(self, sourceShard, destinationShard):
-        regexStr = r'''.*insert or update on table "main_usermessage_(contact|group)s" violates foreign key constraint "main_usermessage_(?:contact|group)s_(?:contact|group)_id_fk".*DETAIL: *Key \((?:contact|group)_id\)=\(([0-9]+)\) is not present in table "main_(?:contact|group)"\..*'''
-        super(MismatchedContactOrGroupResolver, self).__init__(sourceShard, regexStr)
+        super(MismatchedContactOrGroupResolver, self).__init__(sourceShard)
 
     def run(self):
         """Updates the offending usermessages to belong to the correct user-id."""
@@ -745,21 +1130,26 @@ class MismatchedContactOrGroupResolver(AutomaticErrorResolver):
         db_exec('BEGIN', using=self.using)
 
         userId = db_query('''SELECT "user_id" FROM "main_{0}" WHERE "id" = %s'''.format(objectType), (objectId,), using=self.using)[0][0]
-        badUserMessageIds = map(lambda row: str(row[0]), db_query(
-            '''SELECT "um"."id" FROM "main_usermessage_{0}s" "t" JOIN "main_usermessage" "um" ON "um"."id" = "t"."usermessage_id" WHERE "t"."{0}_id" = %s AND "um"."user_id" != %s'''.format(objectType),
-            (objectId, userId,),
+        # The offending user message ids are selected server-side, so the statement text is the same for every object.
+        db_exec(
+            '''
+            UPDATE "main_usermessage" SET "user_id" = %s
+            WHERE "id" IN (SELECT "usermessage_id" FROM "main_usermessage_{0}s" WHERE "{0}_id" = %s) AND "user_id" != %s
+            '''.format(objectType),
+            (userId, objectId, userId,),
             using=self.using
-        ))
-        db_exec('''UPDATE "main_usermessage" SET "user_id" = %s WHERE "id" IN ({0})'''.format(','.join(badUserMessageIds)), (userId,), using=self.using)
+        )
         logging.info(u'MismatchedContactOrGroupResolver :: fixed mismatched usermessages for {0}Id={1} to belong to userId={2} on connection={3}'.format(objectType, objectId, userId, self.using))
         db_exec('COMMIT', using=self.using)
 
 
 class ReceiptMismatchResolver(AutomaticErrorResolver):
     """Fix mis-matched threads."""
+    regex = re.compile(r'''insert or update on table "main_receipt" violates foreign key constraint "main_receipt__message_id_fk".*DETAIL:  Key \(message_id\)=\(([0-9]+)\) is not present in table "main_usermessage"\.''', re.DOTALL)
+    detailKeys = (('message_id', 'is not present'),)
+
     def __init__(self, sourceShard, destinationShard):
-        regexStr = r'''.*insert or update on table "main_receipt" violates foreign key constraint "main_receipt__message_id_fk".*DETAIL:  Key \(message_id\)=\(([0-9]+)\) is not present in table "main_usermessage"\..*'''
-        super(ReceiptMismatchResolver, self).__init__(sourceShard, regexStr)
+        super(ReceiptMismatchResolver, self).__init__(sourceShard)
 
     def run(self):
         """Updates the offending usermessages to belong to the correct user-id."""
@@ -768,16 +1158,23 @@ class ReceiptMismatchResolver(AutomaticErrorResolver):
         db_exec('ROLLBACK', using=self.using)
         db_exec('BEGIN', using=self.using)
 
-        incorrectUserId = db_query('''SELECT "userId" FROM "main_receipt" WHERE "message_id" = %s LIMIT 1''', (userMessageId,), using=self.using)[0][0]
-        correctUserId = db_query(
+        # The receipt is only looked up once, for both its own user-id and that of its contact or group.
+        incorrectUserId, correctUserId = db_query(
             '''
-            SELECT "user_id" FROM "main_contact" WHERE "id" = (SELECT "contact_id" FROM "main_receipt" WHERE "message_id" = %s)
-            UNION
-            SELECT "user_id" FROM "main_group" WHERE "id" = (SELECT "group_id" FROM "main_receipt" WHERE "message_id" = %s)
+            WITH "r" AS (
+                SELECT "contact_id", "group_id", "userId" FROM "main_receipt" WHERE "message_id" = %s LIMIT 1
+            )
+            SELECT
+                "r"."userId",
+                COALESCE(
+                    (SELECT "user_id" FROM "main_contact" WHERE "id" = "r"."contact_id"),
+                    (SELECT "user_id" FROM "main_group" WHERE "id" = "r"."group_id")
+                )
+            FROM "r"
             ''',
-            (userMessageId, userMessageId,),
+            (userMessageId,),
             using=self.using
-        )[0][0]
+        )[0]
         assert incorrectUserId != correctUserId, 'The "good" user-id must not match the incorrect one, but they did ({0} == {1})'.format(correctUserId, incorrectUserId)
         db_exec('''UPDATE "main_usermessage" SET "user_id" = %s WHERE "id" = %s''', (correctUserId, userMessageId), using=self.using)
         logging.info(u'ReceiptMismatchResolver :: fixed mismatched userMessageId={0}, correct userId={1}, incorrect userId={2} on connection={3}'.format(userMessageId, correctUserId, incorrectUserId, self.using))
@@ -805,18 +1202,50 @@ _automaticErrorResolvers = (
     MismatchedContactOrGroupResolver,
 )
 
+# Exception messages are truncated to this many characters before being matched against any of the resolver
+# patterns.  The error and its DETAIL line always come first, so this only drops trailing context/query text which
+# would otherwise be backtracked over by every pattern.
+MAX_RESOLVER_MESSAGE_LENGTH = 4096
+
+_errorDetailRe = re.compile(r'''DETAIL: *Key \(([^)]+)\)=\(.*\) (already exists|is not present)''')
+
+
+def _errorDetailKey(message):
+    """@return tuple of (key column, outcome) extracted from the DETAIL line of a constraint violation, or None."""
+    # Cheap literal scan first, most errors which can't be resolved have no DETAIL line at all.
+    if 'DETAIL:' not in message:
+        return None
+    match = _errorDetailRe.search(message)
+    return match.groups() if match else None
+
+
+# Resolver classes by detail key, in order of precedence.
+#
+# NB: This is used instead of one combined `(?P<name>..)|..` alternation of every resolver's pattern: an alternation
+# renumbers each resolver's capture groups (which its `run()` reads by position), picks whichever pattern matches
+# earliest in the message rather than honoring precedence, and can't fall through to the next candidate when a
+# resolver's `matches()` imposes extra conditions (e.g. `DuplicateIdResolver.tables`).  A single detail key regex
+# pass already narrows each lookup to one or two candidates.
+_automaticErrorResolversByDetailKey = {}
+for _resolverClass in _automaticErrorResolvers:
+    for _detailKey in _resolverClass.detailKeys:
+        _automaticErrorResolversByDetailKey.setdefault(_detailKey, []).append(_resolverClass)
+
+
 def _findAutomaticErrorResolver(sourceShard, destinationShard, exc):
     """
-    Attempt to find a matching automatic resolver.
+    Attempt to find a matching automatic resolver.  The exception is stringified and its detail key extracted once,
+    and only the resolvers registered for that key are instantiated and tried.
 
     @param exc Exception to match against.
 
     @return Matching AutomaticErrorResolver instance or None.
     """
-    for ResolverClass in _automaticErrorResolvers:
+    message = str(exc)[:MAX_RESOLVER_MESSAGE_LENGTH]
+    for ResolverClass in _automaticErrorResolversByDetailKey.get(_errorDetailKey(message), ()):
         instance = ResolverClass(sourceShard, destinationShard)
-        if instance.matches(exc):
-            logging.info(u'_findAutomaticErrorResolver :: Found matching resolver: {0}'.format(instance.__class__.__name__))
+        if instance.matches(message):
+            logging.info(u'_findAutomaticErrorResolver :: Found matching resolver: %s', instance.__class__.__name__)
             return instance
     return None
 
@@ -825,47 +1254,53 @@ MAX_DUMP_COPY_ERRORS = 10
 
 
 def _dumpAndCopyLogicalShardWrapper(logicalShardId, destinationShard, using, userIds=None, **kw):
-    """Automatically attempts to handle recognized error cases."""
-    if 'attemptCount' not in kw or 'lastException' not in kw:
-        # Seed counter during first attempt.
-        kw['attemptCount'] = 1
-        kw['lastException'] = None
-
-    if kw['attemptCount'] > MAX_DUMP_COPY_ERRORS:
-        if 'lastException' in kw and kw['lastException'] is not None:
-            raise kw['lastException']
-        else:
-            raise Exception('Max number of dump/copy retries exceeded')
-
-    try:
-        return _dumpAndCopyLogicalShard(logicalShardId, destinationShard, using, userIds, **kw)
-
-    except Exception, e:
-        # If the same exception occurs twice in a row, don't keep trying to resolve it the same way (astronomically unlikely to work).
-        if 'lastException' in kw and kw['lastException'] is not None and str(e) == str(kw['lastException']):
-            logging.error(u'Got the same exact exception twice, aborting operation')
-            raise
-
-        logging.info(u'_dumpAndCopyLogicalShard :: Caught exception: {0}, will try to resolve automatically..'.format(e))
-        resolver = _findAutomaticErrorResolver(using, destinationShard, e)
-        if resolver is None:
-            logging.error(u'_dumpAndCopyLogicalShard :: Automatic resolution could not be found')
-            raise
+    """
+    Automatically attempts to handle recognized error cases, for up to `MAX_DUMP_COPY_ERRORS` attempts.  The dump is
+    only re-taken after a resolver has altered data on the source shard, otherwise just the copy phase is replayed.
+    """
+    lastException = None
+    dumped = None
 
-        resolver.run()
-        # Rollback on the destination shard connection to establish a known transaction state (no txn in progress).
-        db_exec('ROLLBACK', using=destinationShard)
-        kw['attemptCount'] += 1
-        kw['lastException'] = e
+    for _ in xrange(MAX_DUMP_COPY_ERRORS):
+        try:
+            if dumped is None:
+                dumped = _dumpLogicalShardStatements(logicalShardId, using, userIds, **kw)
+            startedTs, sqlStatements = dumped
+            _copyLogicalShardStatements(logicalShardId, destinationShard, startedTs, sqlStatements)
+            return startedTs
 
-        return _dumpAndCopyLogicalShardWrapper(logicalShardId, destinationShard, using, userIds, **kw)
+        except Exception, e:
+            # If the same exception occurs twice in a row, don't keep trying to resolve it the same way (astronomically unlikely to work).
+            if lastException is not None and str(e) == str(lastException):
+                logging.error(u'Got the same exact exception twice, aborting operation')
+                raise
+
+            logging.info(u'_dumpAndCopyLogicalShard :: Caught exception: %s, will try to resolve automatically..', e)
+            resolver = _findAutomaticErrorResolver(using, destinationShard, e)
+            if resolver is None:
+                logging.error(u'_dumpAndCopyLogicalShard :: Automatic resolution could not be found')
+                raise
+
+            resolver.run()
+            # Rollback on the destination shard connection to establish a known transaction state (no txn in progress).
+            db_exec('ROLLBACK', using=destinationShard)
+            lastException = e
+
+            if resolver.using != destinationShard:
+                # The fix was applied to the source shard's data, so the existing dump is stale.
+                dumped = None
+
+    if lastException is not None:
+        raise lastException
+    else:
+        raise Exception('Max number of dump/copy retries exceeded')
 
 
-def _dumpAndCopyLogicalShard(logicalShardId, destinationShard, using=None, userIds=None, **kw):
+def _dumpLogicalShardStatements(logicalShardId, using=None, userIds=None, **kw):
     """
-    Dump and copy a logical shard.
+    Dump phase: dump a logical shard and back the dump up to S3.
 
-    @return int Started timestamp in epoch format (# of seconds since 1970).
+    @return tuple of (int started timestamp in epoch format, list of SQL statements to execute on the destination).
     """
     startedTs = time.time()
     dump = _dumpLogicalShard(logicalShardId=logicalShardId, using=using, userIds=userIds, **kw)
@@ -875,15 +1310,40 @@ def _dumpAndCopyLogicalShard(logicalShardId, destinationShard, using=None, userI
 
     sqlStatements = _backupDumpAndConvertToSqlList(dump, logicalShardId, startedTs, dumpFinishedTs)
 
+    return int(startedTs), sqlStatements
+
+
+# Consecutive dumped statements are sent to the destination together until their combined length reaches this many
+# characters (a longer statement is sent by itself, rather than copied into a bigger string).
+COPY_PAGE_SIZE = 1024 * 1024
+
+
+def _statementPages(sqlStatements, pageSize=COPY_PAGE_SIZE):
+    """Group consecutive `;`-terminated statements into lists of up to ``pageSize`` characters."""
+    page, pageLength = [], 0
+    for statement in sqlStatements:
+        if len(page) > 0 and pageLength + len(statement) > pageSize:
+            yield page
+            page, pageLength = [], 0
+        page.append(statement)
+        pageLength += len(statement)
+    if len(page) > 0:
+        yield page
+
+
+def _copyLogicalShardStatements(logicalShardId, destinationShard, startedTs, sqlStatements):
+    """Copy phase: execute a logical shard's dumped SQL statements on the destination shard."""
     copyStartedTs = time.time()
 
     numStatements = len(sqlStatements)
     logging.info(u'Executing {0} SQL insert statements on {1}'.format(numStatements, destinationShard))
 
-    for i, statement in enumerate(sqlStatements):
-        statement = statement.replace('%', '%%')
-        logging.info(u'Executing SQL statement {0}/{1}: {2}..'.format(i + 1, numStatements, statement[0:64]))
-        db_exec(statement, using=destinationShard)
+    i = 0
+    for page in _statementPages(sqlStatements):
+        logging.info(u'Executing SQL statements %s-%s/%s: %s..', i + 1, i + len(page), numStatements, page[0][0:64])
+        # NB: Executed verbatim, so the dumped values' `%` characters needn't be escaped.
+        db_exec_raw(page[0] if len(page) == 1 else '\n'.join(page), using=destinationShard)
+        i += len(page)
 
     copyFinishedTs = time.time()
 
@@ -893,29 +1353,37 @@ def _dumpAndCopyLogicalShard(logicalShardId, destinationShard, using=None, userI
     duration = int(copyFinishedTs - startedTs)
     logging.info(u'Dump and copy for logicalShardId={0} took {1} seconds'.format(logicalShardId, duration))
 
-    return int(startedTs)
+
+_toUtf8 = lambda s: s.encode('utf-8') if isinstance(s, unicode) else s
 
 
-def _dump2SqlString(dump, logicalShardId, startedTs, finishedTs):
-    """Convert a logical shard dump to a string of SQL statements."""
-    buf = StringIO()
-    buf.write(u'-- Dump of LogicalShard {0} on {1}\n'.format(logicalShardId, int(startedTs)))
+def _dumpIter(dump, logicalShardId, startedTs):
+    """Generate the UTF-8 encoded lines of a logical shard SQL dump."""
+    yield '-- Dump of LogicalShard ' + str(logicalShardId) + ' on ' + str(int(startedTs)) + '\n'
     for key in dump:
-        buf.write(u'\n\n-- table = {0}\n'.format(key))
+        yield '\n\n-- table = ' + _toUtf8(key) + '\n'
         for statement in dump[key]:
-            buf.write(u'{0}\n'.format(statement))
-    out = buf.getvalue()
-    buf.close()
-    return out
+            yield _toUtf8(statement) + '\n'
+
+
+# Logical shard SQL dumps larger than this many bytes are spooled to disk rather than held in memory.
+DUMP_SPOOL_MAX_SIZE = 64 * 1024 * 1024
+
+
+def _dump2SqlFile(dump, logicalShardId, startedTs, finishedTs):
+    """
+    Convert a logical shard dump to UTF-8 encoded SQL statements in a (rewound) temporary file, which only spills to
+    disk past `DUMP_SPOOL_MAX_SIZE`.  The caller is responsible for closing it.
+    """
+    buf = tempfile.SpooledTemporaryFile(max_size=DUMP_SPOOL_MAX_SIZE, mode='w+b')
+    buf.writelines(_dumpIter(dump, logicalShardId, startedTs))
+    buf.seek(0)
+    return buf
 
 
 def _dump2SqlList(dump):
     """Convert a logical shard dump to a list of SQL statements."""
-    out = []
-    for key in dump:
-        for statement in dump[key]:
-            out.append(statement)
-    return out
+    return [statement for key in dump for statement in dump[key]]
 
 
 def _backupDumpAndConvertToSqlList(dump, logicalShardId, startedTs, finishedTs):
@@ -923,25 +1391,36 @@ def _backupDumpAndConvertToSqlList(dump, logicalShardId, startedTs, finishedTs):
     baseFileName = _baseBackupFileName(logicalShardId, startedTs)
 
     # Upload SQL string to S3.
-    sqlString = _dump2SqlString(dump, logicalShardId, startedTs, finishedTs)
-    sqlStringUrl = uploadFile(baseFileName + '.sql', sqlString)
+    sqlFile = _dump2SqlFile(dump, logicalShardId, startedTs, finishedTs)
+    try:
+        sqlStringUrl = uploadFile(baseFileName + '.sql', sqlFile)
+    finally:
+        sqlFile.close()
     logging.info(u'Uploaded SQL string dump of logicalShard {0}, sqlStringUrl={1}'.format(logicalShardId, sqlStringUrl))
 
-    # Upload JSON-serialized SQL list to S3.
+    # Upload JSON-serialized SQL list to S3, encoded incrementally into a spooled file rather than one big string.
     sqlList = _dump2SqlList(dump)
-    sqlListUrl = uploadFile(baseFileName + '.json', json.dumps(sqlList))
+    jsonFile = tempfile.SpooledTemporaryFile(max_size=DUMP_SPOOL_MAX_SIZE, mode='w+b')
+    try:
+        json.dump(sqlList, jsonFile)
+        jsonFile.seek(0)
+        sqlListUrl = uploadFile(baseFileName + '.json', jsonFile)
+    finally:
+        jsonFile.close()
     logging.info(u'Uploaded JSON list dump of logicalShard {0}, sqlStringUrl={1}'.format(logicalShardId, sqlListUrl))
     return sqlList
 
 
 def _dumpLogicalShard(logicalShardId, using=None, userIds=None, **kw):
     """Dump all data for a logical shard."""
+    physicalShardId = None
+
     if using is None:
         physicalShardId = _physicalShardId(logicalShardId)
         using = coerceIdToShardName(physicalShardId)
 
     if userIds is None:
-        if 'physicalShardId' not in vars():
+        if physicalShardId is None:
             physicalShardId = _physicalShardId(logicalShardId)
         userIds = _logicalShardUserIds(logicalShardId, physicalShardId)
 
@@ -959,36 +1438,49 @@ seedTableColumnPairs = (
     ('main_group', 'user_id'),
 )
 
-preMigrationSql = [
+preMigrationSql = (
     'BEGIN;',
     'SET CONSTRAINTS ALL DEFERRED;',
-]
+)
 
-postMigrationSql = [
+postMigrationSql = (
     'SET CONSTRAINTS ALL IMMEDIATE;',
     'COMMIT;',
-]
+)
 
 
 @memoize
 def _userIdTableColumnPairs():
-    """@return list of <table,column> pairs for tables with user-id columns."""
+    """@return tuple of <table,column> pairs for tables with user-id columns."""
     # Uniqify set of items while retaining original list order.
-    return list(OrderedDict.fromkeys(list(seedTableColumnPairs) + findTablesWithUserIdColumn()))
+    return tuple(OrderedDict.fromkeys(seedTableColumnPairs + tuple(findTablesWithUserIdColumn())))
 
 
-def _verifyTheseUsersExistInShard(userIds, using):
-    """Assert that all user-ids exist in the specified database."""
-    inUserIds = ','.join(map(str, userIds))
+@memoize
+def _userIdTables():
+    """@return tuple of the table names from `_userIdTableColumnPairs()`, e.g. for `discoverDependencies()`."""
+    return tuple(table for table, _ in _userIdTableColumnPairs())
 
-    # Verify that the requested users exist on the sourceShard indicated.
-    userCheck = db_query('''SELECT count(*) FROM "auth_user" WHERE "id" IN ({0})'''.format(inUserIds), using=using)
-    assert userCheck[0][0] == len(userIds), 'not all userIds in ({0}) not found on {1}'.format(userIds, using)
+
+def _sqlIdList(ids):
+    """
+    Render ids as the inside of an SQL `IN (..)` list, for SQL which can't take bound parameters (e.g. dblink queries,
+    which run remotely from inside a string literal).  Every id is coerced to an int so nothing else can be injected.
+    """
+    return ','.join(str(int(i)) for i in ids)
+
+
+def _verifyTheseUsersExistInShard(userIds, using):
+    """Assert that all user-ids exist in the specified database."""
+    # Verify that the requested users exist on the sourceShard indicated.
+    userCheck = db_query('''SELECT count(*) FROM "auth_user" WHERE "id" = ANY(%s)''', (map(int, userIds),), using=using)
+    assert userCheck[0][0] == len(userIds), 'not all userIds in ({0}) not found on {1}'.format(userIds, using)
 
 
 def dumpUsers(userIds, using, **kw):
     """
-    Dump complete user records to dict of a list of insert statement lists.
+    Dump complete user records to dict of a list of insert statement lists.  Each table's records are dumped as a
+    single multi-row INSERT statement.
 
     @param userIds list of int.
     @param using mixed str or int Source connection name or shard id.
@@ -997,7 +1489,7 @@ def dumpUsers(userIds, using, **kw):
     """
     from .select2insert import select2multiInsert
 
-    logging.info('Dumping users ({0}) from {1}'.format(userIds, using))
+    logging.info('Dumping users (%s) from %s', userIds, using)
 
     deactivateTriggers = kw.get('deactivateTriggers', True)
 
@@ -1005,7 +1497,8 @@ def dumpUsers(userIds, using, **kw):
 
     _verifyTheseUsersExistInShard(userIds, using)
 
-    inUserIds = ','.join(map(str, userIds))
+    userIdsArray = map(int, userIds)
+    ignoredTables = _ignoredTables()
 
     # Keep track of inserts on a per-table basis.
     inserts = OrderedDict()
@@ -1014,50 +1507,60 @@ def dumpUsers(userIds, using, **kw):
 
     def collectInserts(table, whereClause):
         """
-        Given a table and where-clause, appends the list of inserts for the matching records from that table to a
-        corresponding key for that table in the ``inserts`` dict.
+        Given a table and where-clause (binding the user-ids array for its %s), appends the list of inserts for the
+        matching records from that table to a corresponding key for that table in the ``inserts`` dict.
         """
-        sql = select2multiInsert(table=table, description=describe(table), using=using, whereClause=whereClause)
-        if sql is not None:
-            if table not in inserts:
-                inserts[table] = []
-            inserts[table].append(sql)
+        sql = select2multiInsert(
+            table=table,
+            description=describe(table, using=using),
+            using=using,
+            whereClause=whereClause,
+            args=(userIdsArray,)
+        )
+        if sql is None:
+            return
+
+        if table not in inserts:
+            inserts[table] = [sql]
+        else:
+            # Same table and columns, so fold the rows into the table's existing multi-row INSERT rather than adding
+            # another statement (and round-trip) to the copy phase.
+            inserts[table][0] = u'{0},{1}'.format(inserts[table][0][:-1], sql.split(u' VALUES ', 1)[1])
 
     def collectRecords(sourceTable, sourcePkColumn, innerTable, innerColumn, innerUserIdColumn):
         """Generic way to move rows containing ``userIds`` from one shard to another."""
-        if shouldTableBeIgnoredForUserOperations(sourceTable):
-            logging.debug(u'Skipping copy to static table: {0}'.format(sourceTable))
+        if sourceTable in ignoredTables:
+            logging.debug(u'Skipping copy to static table: %s', sourceTable)
             return
 
         collectInserts(
             sourceTable,
             whereClause='"{pk}" IN (' \
-                'SELECT "{innerColumn}" FROM "{innerTable}" WHERE "{innerUserIdColumn}" in ({userIds})' \
+                'SELECT "{innerColumn}" FROM "{innerTable}" WHERE "{innerUserIdColumn}" = ANY(%s)' \
             ')'.format(
                 pk=sourcePkColumn,
                 innerColumn=innerColumn,
                 innerTable=innerTable,
-                innerUserIdColumn=innerUserIdColumn,
-                userIds=inUserIds
+                innerUserIdColumn=innerUserIdColumn
             )
         )
 
     # Uniqify set of items while retaining original list order.
     userIdTableColumnPairs = _userIdTableColumnPairs()
 
-    dependencies = discoverDependencies(map(lambda x: x[0], userIdTableColumnPairs), using=using)
+    dependencies = discoverDependencies(_userIdTables(), using=using)
 
-    populatedTables = []
+    populatedTables = set()
 
     for table, userIdColumn in userIdTableColumnPairs:
-        logging.debug(u'(1) TABLE={0}'.format(table))
+        logging.debug(u'(1) TABLE=%s', table)
 
-        if shouldTableBeIgnoredForUserOperations(table):
-            logging.debug(u'Skipping dump from static table: {0}'.format(table))
+        if table in ignoredTables:
+            logging.debug(u'Skipping dump from static table: %s', table)
             continue
 
         if table in populatedTables:
-            logging.info(u'Skipping dump from already populated table: {0}'.format(table))
+            logging.info(u'Skipping dump from already populated table: %s', table)
             continue
 
         if table in _additionalRelations:
@@ -1066,27 +1569,26 @@ def dumpUsers(userIds, using, **kw):
                 collectRecords(sourceTable, sourcePkColumn, fkTable, fkColumn, userIdColumn)
 
         # Collect relevant records from the table.
-        collectInserts(table, '''"{0}" IN ({1})'''.format(userIdColumn, inUserIds))
-        populatedTables.append(table)
+        collectInserts(table, '''"{0}" = ANY(%s)'''.format(userIdColumn))
+        populatedTables.add(table)
 
     # Backfill dependent tables.
     for table, userIdColumn in userIdTableColumnPairs:
-        logging.debug(u'(2) TABLE={0}'.format(table))
+        logging.debug(u'(2) TABLE=%s', table)
 
-        if shouldTableBeIgnoredForUserOperations(table):
-            logging.debug(u'Dependencies backfiller is skipping static table: {0}'.format(table))
+        if table in ignoredTables:
+            logging.debug(u'Dependencies backfiller is skipping static table: %s', table)
             continue
 
         # If there are additional dependencies, insert them as well.
         if table in dependencies:
-            unpopulatedTables = \
-                filter(lambda (col, fkTable, fkCol): fkTable not in populatedTables, dependencies[table])
+            unpopulatedTables = [dependency for dependency in dependencies[table] if dependency[1] not in populatedTables]
 
             for column, fkTable, fkColumn in unpopulatedTables:
                 collectRecords(fkTable, fkColumn, table, column, userIdColumn)
-                populatedTables.append(fkTable)
+                populatedTables.add(fkTable)
 
-    inserts['__post__'] = postMigrationSql
+    inserts['__post__'] = list(postMigrationSql)
     if deactivateTriggers:
         inserts['__post__'].append('ALTER TABLE "main_contact" ENABLE TRIGGER "main_contact_trigger";')
 
@@ -1123,7 +1625,8 @@ def migrateUsers(userIds, sourceShard, destinationShard, **kw):
     # Notify subscribers about update.
     shardId = destinationShard[destinationShard.rindex('_') + 1:]
     se = ShardEvent()
-    map(lambda userId: se.publish('movedUser', {'userId': userId, 'shardId': shardId}), userIds)
+    for userId in userIds:
+        se.publish('movedUser', {'userId': userId, 'shardId': shardId})
 
 
 def migrateUser(userId, sourceShard, destinationShard, **kw):
@@ -1138,6 +1641,187 @@ _additionalRelations = {
     'main_groupshare': [('main_groupshare', 'invitation_ptr_id', 'main_invitation'),],
 }
 
+
+@memoize
+def _tableDependencyOrder(userIdTableColumnPairs, using, reverse=False):
+    """
+    Order <table,column> pairs with Kahn's algorithm so that referenced tables come before the tables which reference
+    them (or after, when ``reverse`` is True, as is needed for deletion).
+
+    @return tuple of (orderedPairs, cyclicPairs), where cyclicPairs are the pairs which could not be ordered because
+        they participate in (or depend on) a dependency cycle.
+    """
+    pairsByTable = OrderedDict()
+    for table, userIdColumn in userIdTableColumnPairs:
+        pairsByTable.setdefault(table, []).append((table, userIdColumn))
+
+    # dict(table -> set of tables which must be handled first).
+    requires = dict((table, set()) for table in pairsByTable)
+
+    def addEdge(referencingTable, referencedTable):
+        if referencingTable == referencedTable or referencingTable not in requires or referencedTable not in requires:
+            return
+        if reverse is True:
+            requires[referencedTable].add(referencingTable)
+        else:
+            requires[referencingTable].add(referencedTable)
+
+    references = allTableRelations(using=using)[0]
+    for table in pairsByTable:
+        for _, referencedTable, _ in references.get(table, []):
+            addEdge(table, referencedTable)
+
+    for table, relations in _additionalRelations.items():
+        for fkTable, _, sourceTable in relations:
+            addEdge(fkTable, sourceTable)
+
+    inDegree = dict((table, len(required)) for table, required in requires.items())
+    dependents = dict((table, []) for table in pairsByTable)
+    for table, required in requires.items():
+        for requiredTable in required:
+            dependents[requiredTable].append(table)
+
+    ready = deque(table for table in pairsByTable if inDegree[table] == 0)
+    orderedPairs = []
+
+    while len(ready) > 0:
+        table = ready.popleft()
+        orderedPairs.extend(pairsByTable[table])
+        for dependent in dependents[table]:
+            inDegree[dependent] -= 1
+            if inDegree[dependent] == 0:
+                ready.append(dependent)
+
+    cyclicPairs = [pair for table, pairs in pairsByTable.items() if inDegree[table] > 0 for pair in pairs]
+
+    return (orderedPairs, cyclicPairs)
+
+
+# SQLSTATE's of errors caused by other transactions holding locks (deadlock_detected, lock_not_available), retrying
+# these within the same transaction won't help.
+_lockConflictPgCodes = frozenset(['40P01', '55P03'])
+
+# Message fragments checked when no SQLSTATE is available.
+_lockConflictMessages = ('waits for ShareLock', 'deadlock detected')
+
+
+def _isLockConflict(exc):
+    """
+    Check the SQLSTATE of a database error rather than its (possibly localized) message.  Looks through the wrappers
+    added by Django (``__cause__``) and SqlAlchemy (``orig``) to the underlying psycopg2 exception.
+
+    NB: Older versions of Django re-raise `DatabaseError(*e.args)`, which has neither a pgcode nor a __cause__, so
+    the message is still checked as a fallback.
+
+    @return True if ``exc`` was caused by a lock conflict with another transaction, otherwise False.
+    """
+    for candidate in (exc, getattr(exc, '__cause__', None), getattr(exc, 'orig', None)):
+        if getattr(candidate, 'pgcode', None) in _lockConflictPgCodes:
+            return True
+
+    message = str(exc)
+    return any(fragment in message for fragment in _lockConflictMessages)
+
+
+def _runInDependencyOrder(orderedPairs, cyclicPairs, fn, using, trackedTables=None, flush=None):
+    """
+    Invoke ``fn(table, userIdColumn)`` exactly once for each of the ``orderedPairs``.  The ``cyclicPairs`` have no
+    valid ordering, so they are first attempted all together inside a single savepoint (deferred constraints usually
+    make any order work); if that fails each of them is attempted inside its own savepoint and re-queued on failure
+    until they all succeed or no further progress can be made.
+
+    @param trackedTables set Optional set of tables which ``fn`` adds to, restored whenever a savepoint is rolled back.
+    @param flush function Optional, for when ``fn`` only queues up its statements: invoked to execute everything
+        queued so far, once after all of the ``orderedPairs`` and then after each attempt at the ``cyclicPairs``.
+    """
+    if flush is None:
+        flush = lambda: None
+
+    for table, userIdColumn in orderedPairs:
+        fn(table, userIdColumn)
+    flush()
+
+    if len(cyclicPairs) == 0:
+        return
+
+    logging.info(u'[%s] Dependency cycle among tables: %s', using, cyclicPairs)
+
+    def rollbackTo(savePointName, trackedSnapshot):
+        db_exec('ROLLBACK TO {0}'.format(savePointName), using=using)
+        if trackedTables is not None:
+            trackedTables.intersection_update(trackedSnapshot)
+
+    trackedSnapshot = set(trackedTables or ())
+    db_exec('SAVEPOINT save_all', using=using)
+
+    try:
+        for table, userIdColumn in cyclicPairs:
+            fn(table, userIdColumn)
+        flush()
+        db_exec('RELEASE SAVEPOINT save_all', using=using)
+        return
+
+    except Exception, e:
+        logging.info(u'[%s] Caught exception -----\n%s----- falling back to per-table retries', using, e)
+        rollbackTo('save_all', trackedSnapshot)
+        if _isLockConflict(e):
+            raise e
+
+    remainingPairs = deque(cyclicPairs)
+    savePoint = 0
+    n = 0 # Count number of iterations since last success.
+
+    # Savepoint bookkeeping is piggybacked onto the next round-trip: a successful attempt's RELEASE goes out together
+    # with the following SAVEPOINT, and a failed attempt's savepoint survives ROLLBACK TO, so it is simply reused.
+    pendingSql = ['RELEASE SAVEPOINT save_all']
+    needSavePoint = True
+
+    while len(remainingPairs) > 0:
+        n += 1
+        if n > len(cyclicPairs) * 2:
+            raise Exception('Dependency cycle detected among: {0}'.format(list(remainingPairs)))
+
+        table, userIdColumn = remainingPairs.popleft()
+
+        if needSavePoint is True:
+            savePoint += 1
+            pendingSql.append('SAVEPOINT save{0}'.format(savePoint))
+            db_exec('; '.join(pendingSql), using=using)
+            pendingSql = []
+            needSavePoint = False
+            trackedSnapshot = set(trackedTables or ())
+
+        try:
+            fn(table, userIdColumn)
+            flush()
+            pendingSql.append('RELEASE SAVEPOINT save{0}'.format(savePoint))
+            needSavePoint = True
+            # Reset cycle detector counter.
+            n = 0
+
+        except Exception, e:
+            logging.info(
+                u'[%s] Caught exception -----\n%s----- for table=%s/userIdColumn=%s, will retry',
+                using, e, table, userIdColumn
+            )
+            rollbackTo('save{0}'.format(savePoint), trackedSnapshot)
+            if _isLockConflict(e):
+                raise e
+            remainingPairs.append((table, userIdColumn))
+
+    if len(pendingSql) > 0:
+        db_exec('; '.join(pendingSql), using=using)
+
+
+# Selects the source rows referenced from an inner table's rows for the user-ids, normalized once up front so that
+# only the formatting is done per call.
+_remotelyFillTableDbLinkSql = toSingleLine('''
+    SELECT * FROM "{sourceTable}" WHERE "{pk}" IN (
+        SELECT "{innerColumn}" FROM "{innerTable}" WHERE "{innerUserIdColumn}" in ({userIds})
+    )
+''')
+
+
 def copyUsers(userIds, sourceShard, destinationShard, **kw):
     """
     Migrate all records for a particular user-id from one physical shard to another.
@@ -1152,51 +1836,71 @@ def copyUsers(userIds, sourceShard, destinationShard, **kw):
         ``deactivateTriggers`` bool Defaults to True.  Flag to determine whether or not triggers will be disabled.
         ``manageTransactions`` bool Defaults to True.  Flat to determine whether or not the function will manage the
             transaction.
+        ``deferConstraints`` bool Defaults to True.  When False and the user-id tables can be ordered without any
+            cycles, constraints are left to be checked as each insert happens rather than all at once before COMMIT,
+            which avoids queueing a deferred trigger event for every copied row.  Only safe when every backfilled table
+            only references tables which are copied before it.
     """
     preCommitCb = kw.get('preCommitCb', None)
     commitDestinationShard = kw.get('commitDestinationShard', True)
     deactivateTriggers = kw.get('deactivateTriggers', True)
     manageTransactions = kw.get('manageTransactions', True)
+    deferConstraints = kw.get('deferConstraints', True)
 
     def ifManagingTransactionsThenExec(sql, using):
         """Will only execute the statement if ``manageTransactions`` is True."""
         if manageTransactions is True:
             db_exec(sql, using=using)
 
-    inUserIds = ','.join(map(str, userIds))
+    if len(userIds) == 0:
+        logging.info(u'copyUsers: No user-ids, nothing to copy')
+        return
+
+    inUserIds = _sqlIdList(userIds)
+    ignoredTables = _ignoredTables()
 
     _verifyTheseUsersExistInShard(userIds, sourceShard)
 
+    # The dblink inserts are queued up and sent to the destination shard together (see `_runInDependencyOrder()`).
+    pendingInserts = []
+
+    def queueInsert(table, dbLinkSql):
+        pendingInserts.append(autoDbLinkInsertSql(table, dbLinkSql, sourceShard, destinationShard))
+
+    def flushInserts():
+        if len(pendingInserts) == 0:
+            return
+        sql = ';\n'.join(pendingInserts)
+        # NB: Cleared first, a failed batch is rolled back and must not be re-sent.
+        del pendingInserts[:]
+        db_exec(sql, using=destinationShard)
+
     def remotelyFillTable(sourceTable, sourcePkColumn, innerTable, innerColumn, innerUserIdColumn):
         """Generic way to move rows containing ``userIds`` from one shard to another."""
-        if shouldTableBeIgnoredForUserOperations(sourceTable):
-            logging.debug(u'Skipping copy to static table: {0}'.format(sourceTable))
+        if sourceTable in ignoredTables:
+            logging.debug(u'Skipping copy to static table: %s', sourceTable)
             return
 
-        dbLinkSql = toSingleLine(
-            '''
-                SELECT * FROM "{sourceTable}" WHERE "{pk}" IN (
-                    SELECT "{innerColumn}" FROM "{innerTable}" WHERE "{innerUserIdColumn}" in ({userIds})
-                )
-            '''.format(
-                sourceTable=sourceTable,
-                pk=sourcePkColumn,
-                innerColumn=innerColumn,
-                innerTable=innerTable,
-                innerUserIdColumn=innerUserIdColumn,
-                userIds=inUserIds
-            )
+        dbLinkSql = _remotelyFillTableDbLinkSql.format(
+            sourceTable=sourceTable,
+            pk=sourcePkColumn,
+            innerColumn=innerColumn,
+            innerTable=innerTable,
+            innerUserIdColumn=innerUserIdColumn,
+            userIds=inUserIds
         )
 
         # Insert relevant records from the table.
-        autoDbLinkInsert(sourceTable, dbLinkSql, sourceShard, destinationShard)
+        queueInsert(sourceTable, dbLinkSql)
 
     # Uniqify set of items while retaining original list order.
     userIdTableColumnPairs = _userIdTableColumnPairs()
 
     sourceCountsInitial = tableRowCounts(userIdTableColumnPairs, userIds, using=sourceShard)
 
-    dependencies = discoverDependencies(map(lambda x: x[0], userIdTableColumnPairs), using=sourceShard)
+    dependencies = discoverDependencies(_userIdTables(), using=sourceShard)
+
+    orderedPairs, cyclicPairs = _tableDependencyOrder(userIdTableColumnPairs, sourceShard)
 
     if deactivateTriggers is True:
         # Disable all triggers.
@@ -1207,97 +1911,58 @@ def copyUsers(userIds, sourceShard, destinationShard, **kw):
 
     # NB: About set constraints all deferred:
     # http://www.postgresql.org/docs/devel/static/sql-set-constraints.html
-    ifManagingTransactionsThenExec('SET CONSTRAINTS ALL DEFERRED', using=destinationShard)
+    if deferConstraints is True or len(cyclicPairs) > 0:
+        ifManagingTransactionsThenExec('SET CONSTRAINTS ALL DEFERRED', using=destinationShard)
 
-    populatedTables = []
-
-    ordering = []
-
-    userIdTableColumnPairsCopy = list(userIdTableColumnPairs)
-    savePoint = 0
-    n = 0
-
-    #for table, userIdColumn in userIdTableColumnPairs:
-    while len(userIdTableColumnPairsCopy) > 0:
-        n += 1
-        if n > len(userIdTableColumnPairs) * 2:
-            raise Exception('Dependency cycle detected')
+    populatedTables = set()
 
-        table, userIdColumn = userIdTableColumnPairsCopy.pop(0)
-        logging.debug(u'TABLE={0}'.format(table))
+    def fillTable(table, userIdColumn):
+        """Copy the rows belonging to ``userIds`` for a single table (along with any additional relations)."""
+        logging.debug(u'TABLE=%s', table)
 
-        if shouldTableBeIgnoredForUserOperations(table):
-            logging.debug(u'Skipping copy to static table: {0}'.format(table))
-            continue
+        if table in ignoredTables:
+            logging.debug(u'Skipping copy to static table: %s', table)
+            return
 
         if table in populatedTables:
-            logging.info(u'Skipping copy to already populated table: {0}'.format(table))
-            continue
+            logging.info(u'Skipping copy to already populated table: %s', table)
+            return
 
-        try:
-            savePoint += 1
-            db_exec('SAVEPOINT save{0}'.format(savePoint), using=destinationShard)
+        if table in _additionalRelations:
+            for fkTable, fkColumn, sourceTable in _additionalRelations[table]:
+                sourcePkColumn = getPrimaryKeyColumns(sourceTable, using=destinationShard)[0]
+                remotelyFillTable(sourceTable, sourcePkColumn, fkTable, fkColumn, userIdColumn)
 
-            if table in _additionalRelations:
-                for fkTable, fkColumn, sourceTable in _additionalRelations[table]:
-                    sourcePkColumn = getPrimaryKeyColumns(sourceTable, using=destinationShard)[0]
-                    remotelyFillTable(sourceTable, sourcePkColumn, fkTable, fkColumn, userIdColumn)
+        dbLinkSql = '''SELECT * FROM "{0}" WHERE "{1}" IN ({2})'''.format(table, userIdColumn, inUserIds)
 
-            dbLinkSql = '''SELECT * FROM "{0}" WHERE "{1}" IN ({2})'''.format(table, userIdColumn, inUserIds)
+        # Insert relevant records from the table.
+        queueInsert(table, dbLinkSql)
+        populatedTables.add(table)
 
-            # Insert relevant records from the table.
-            autoDbLinkInsert(table, dbLinkSql, sourceShard, destinationShard)
-            populatedTables.append(table)
-            db_exec('RELEASE SAVEPOINT save{0}'.format(savePoint), using=destinationShard)
-            n = 0
+    def backfillTable(table, userIdColumn):
+        """Copy rows from tables outside of the user-id set which depend on ``table``."""
+        if table in ignoredTables:
+            logging.debug(u'Dependencies backfiller is skipping static table: %s', table)
+            return
 
-        except Exception, e:
-            logging.info(u'Caught exception, will handle with it: {0}'.format(e))
-            db_exec('ROLLBACK TO save{0}'.format(savePoint), using=destinationShard)
-            userIdTableColumnPairsCopy.append((table, userIdColumn))
+        # If there are additional dependencies, insert them as well.
+        if table in dependencies:
+            unpopulatedTables = [dependency for dependency in dependencies[table] if dependency[1] not in populatedTables]
 
-        ordering.append((table, userIdColumn))
+            for column, fkTable, fkColumn in unpopulatedTables:
+                remotelyFillTable(fkTable, fkColumn, table, column, userIdColumn)
+                populatedTables.add(fkTable)
 
-    userIdTableColumnPairsCopy = list(userIdTableColumnPairs)
-    savePoint = 0
+    _runInDependencyOrder(orderedPairs, cyclicPairs, fillTable, using=destinationShard, trackedTables=populatedTables, flush=flushInserts)
 
     # Backfill dependent tables.
-    #for table, userIdColumn in userIdTableColumnPairs:
-    while len(userIdTableColumnPairsCopy) > 0:
-        n += 1
-        if n > len(userIdTableColumnPairs) * 2:
-            raise Exception('Dependency cycle detected')
-
-        table, userIdColumn = userIdTableColumnPairsCopy.pop(0)
-
-        if shouldTableBeIgnoredForUserOperations(table):
-            logging.debug(u'Dependencies backfiller is skipping static table: {0}'.format(table))
-            continue
-
-        try:
-            savePoint += 1
-            db_exec('SAVEPOINT save{0}'.format(savePoint), using=destinationShard)
-
-            # If there are additional dependencies, insert them as well.
-            if table in dependencies:
-                unpopulatedTables = filter(
-                    lambda (col, fkTable, fkCol): fkTable not in populatedTables,
-                    dependencies[table]
-                )
-
-                for column, fkTable, fkColumn in unpopulatedTables:
-                    remotelyFillTable(fkTable, fkColumn, table, column, userIdColumn)
-                    populatedTables.append(fkTable)
-            db_exec('RELEASE SAVEPOINT save{0}'.format(savePoint), using=destinationShard)
-            n = 0
-
-        except Exception, e:
-            logging.info(u'Caught exception, will handle with it: {0}'.format(e))
-            db_exec('ROLLBACK TO save{0}'.format(savePoint), using=destinationShard)
-            userIdTableColumnPairsCopy.append((table, userIdColumn))
+    _runInDependencyOrder(orderedPairs, cyclicPairs, backfillTable, using=destinationShard, trackedTables=populatedTables, flush=flushInserts)
 
+    # The source is re-counted on its own connection while the destination (which has to see the rows this transaction
+    # inserted) is counted here.
+    sourceCountsVerifyResult = db_parallel_async((tableRowCounts, (userIdTableColumnPairs, userIds), {'using': sourceShard}))
     destinationCountsVerify = tableRowCounts(userIdTableColumnPairs, userIds, using=destinationShard)
-    sourceCountsVerify = tableRowCounts(userIdTableColumnPairs, userIds, using=sourceShard)
+    sourceCountsVerify = sourceCountsVerifyResult()[0]
 
     if destinationCountsVerify == sourceCountsInitial and destinationCountsVerify == sourceCountsVerify:
         # Before proceeding, set constraints to all immediate.
@@ -1339,10 +2004,295 @@ def copyUsers(userIds, sourceShard, destinationShard, **kw):
 
 
 def copyUser(userId, sourceShard, destinationShard, **kw):
-    """Copy a single user."""
+    """
+    Copy a single user.
+
+    NB: Deprecated for copying more than one user, each call is a complete transaction with a round-trip per table;
+    use `copyUsers()` with all of the user-ids instead.
+    """
     return copyUsers([userId], sourceShard, destinationShard, **kw)
 
 
+# Temporary hacks, run by `deleteUsers()` before the per-table deletes.
+# The parent row-sets are each looked up once, as CTE's shared by all of the tables hanging off of them (every %s
+# takes the user-ids array).  The parent rows themselves are left for the per-table deletes, which also need them to
+# find any other dependents.
+_cleanupWithSql = ', '.join([
+    '"voicemails" AS (SELECT "id" FROM "main_voicemail" WHERE "user_id" = ANY(%s))',
+    '"invitations" AS (SELECT "id" FROM "main_invitation" WHERE "user_id" = ANY(%s) OR "owner_id" = ANY(%s))',
+    '"contacts" AS (SELECT "id" FROM "main_contact" WHERE "user_id" = ANY(%s))',
+    '"groups" AS (SELECT "id" FROM "main_group" WHERE "user_id" = ANY(%s))',
+    '"voicecalls" AS (SELECT "id" FROM "main_voicecall" WHERE "user_id" = ANY(%s))',
+    '"extendedusers" AS (SELECT "twilio_phone_number_id", "entitlement_id" FROM "main_extendeduser" '
+        'WHERE "user_id" = ANY(%s))',
+])
+
+# List of (table, condition) pairs, all independent of one another so they can go out in a single statement.
+_cleanupDeletes = [
+    ('main_voicemailtranscription', '"voiceMail_id" IN (SELECT "id" FROM "voicemails")'),
+    ('main_groupshare', '"invitation_ptr_id" IN (SELECT "id" FROM "invitations")'),
+    ('main_sendhubinvitation', '"invitation_ptr_id" IN (SELECT "id" FROM "invitations")'),
+    ('main_enterpriseinvitation', '"invitation_ptr_id" IN (SELECT "id" FROM "invitations")'),
+    ('main_usermessage_contacts', '"contact_id" IN (SELECT "id" FROM "contacts")'),
+    ('main_contact_groups', '"contact_id" IN (SELECT "id" FROM "contacts")'),
+    ('main_contactparent', '"contact_id" IN (SELECT "id" FROM "contacts")'),
+    ('main_usermessage_groups', '"group_id" IN (SELECT "id" FROM "groups")'),
+    ('main_groupshortcode', '"group_id" IN (SELECT "id" FROM "groups")'),
+    ('main_receipt', '"group_id" IN (SELECT "id" FROM "groups")'),
+    ('main_callobservation', '"voiceCall" IN (SELECT "id" FROM "voicecalls")'),
+    ('main_voicecallrating', '"voiceCall" IN (SELECT "id" FROM "voicecalls")'),
+    ('main_phonenumber', '"id" IN (SELECT "twilio_phone_number_id" FROM "extendedusers")'),
+    ('main_entitlement', '"id" IN (SELECT "entitlement_id" FROM "extendedusers")'),
+]
+
+# Tables emptied by the cleanup deletes, see the ``analyzeCleanedTables`` option of `deleteUsers()`.
+_cleanupAnalyzeTables = tuple(table for table, _ in _cleanupDeletes) + ('main_invitation',)
+
+
+# Columns leading an index on a "public" table which the FK checks can use, i.e. neither partial nor on expressions.
+_indexedColumnsSql = '''
+    SELECT "t"."relname", "a"."attname"
+    FROM "pg_catalog"."pg_index" "i"
+        JOIN "pg_catalog"."pg_class" "t" ON "t"."oid" = "i"."indrelid"
+        JOIN "pg_catalog"."pg_namespace" "n" ON "n"."oid" = "t"."relnamespace"
+        JOIN "pg_catalog"."pg_attribute" "a" ON "a"."attrelid" = "i"."indrelid" AND "a"."attnum" = "i"."indkey"[0]
+    WHERE
+        "n"."nspname" = 'public' AND
+        "i"."indpred" IS NULL AND
+        "i"."indexprs" IS NULL
+'''
+
+
+def installForeignKeyIndexes(using):
+    """
+    Create an index on every referencing column which user deletion cascades through, i.e. the foreign-key columns
+    found by `discoverDependencies()` and those in `_additionalRelations`, unless one already leads a plain index.
+
+    Without them every deleted parent row makes Postgres sequentially scan the referencing table during the FK check.
+
+    NB: Creating an index locks out writers to the table until it is done.
+
+    @param using str Connection name.
+
+    @return list of (table, column) pairs which were indexed.
+    """
+    indexed = set(db_query(toSingleLine(_indexedColumnsSql), using=using))
+
+    candidates = set()
+    for relations in discoverDependencies(_userIdTables(), using=using).values():
+        for _, fkTable, fkColumn in relations:
+            candidates.add((fkTable, fkColumn))
+    for relations in _additionalRelations.values():
+        for fkTable, fkColumn, _ in relations:
+            candidates.add((fkTable, fkColumn))
+
+    created = []
+
+    for table, column in sorted(candidates - indexed):
+        # NB: Postgres truncates identifiers to 63 characters, so the name ends with a hash of the full table/column to
+        # keep long names which share a prefix apart.
+        suffix = '_{0}_fk'.format(hashlib.md5('{0}.{1}'.format(table, column)).hexdigest()[:8])
+        indexName = '{0}_{1}'.format(table, column.lower())[:63 - len(suffix)] + suffix
+        logging.info(u'[%s] Creating index on foreign-key column: %s.%s', using, table, column)
+        db_exec('''CREATE INDEX "{0}" ON "{1}" ("{2}")'''.format(indexName, table, column), using=using)
+        created.append((table, column))
+
+    if len(created) > 0:
+        clearSchemaCaches()
+
+    return created
+
+
+# Maximum number of rows removed by a single DELETE statement.  Postgres queues an AFTER trigger event for every
+# row touched by an FK check, so unbounded deletes for large users can exhaust memory.
+DELETE_CHUNK_SIZE = 50000
+
+
+def _chunkedDeletes(deletes, args, using, chunkSize=DELETE_CHUNK_SIZE, withSql=None, withArgs=()):
+    """
+    Delete the rows matching each of the independent (table, condition) pairs in ``deletes`` in batches of at most
+    ``chunkSize`` rows per table.  Every batch is issued as a single statement of data-modifying CTE's, so all of the
+    tables are worked on in the same round-trip.
+
+    NB: All conditions must be independent of one another (i.e. none may select from a table which another one
+    deletes from), since every CTE in the statement sees the same snapshot.
+
+    @param args tuple Arguments for a single condition, repeated for each one in the statement.
+    @param withSql str Optional leading CTE definition(s) which the conditions may select from, e.g.
+        '"parent" AS (SELECT "id" FROM "main_group" WHERE "user_id" = ANY(%s))'.
+    @param withArgs tuple Arguments for ``withSql``.
+
+    @return list of int Total number of rows deleted for each of the ``deletes``.
+    """
+    totals = [0] * len(deletes)
+    pending = range(len(deletes))
+
+    # Each statement is assembled from these, built once regardless of how many batches it takes.
+    ctes = [
+        (
+            '"deleted{i}" AS (DELETE FROM "{table}" WHERE ctid = ANY(ARRAY('
+            'SELECT ctid FROM "{table}" WHERE {condition} LIMIT {chunkSize}'
+            ')) RETURNING 1)'
+        ).format(i=i, table=table, condition=condition, chunkSize=int(chunkSize))
+        for i, (table, condition) in enumerate(deletes)
+    ]
+    counters = ['(SELECT COUNT(*) FROM "deleted{0}")'.format(i) for i in range(len(deletes))]
+    leadingCtes = [withSql] if withSql is not None else []
+
+    while len(pending) > 0:
+        sql = 'WITH {0} SELECT {1}'.format(
+            ', '.join(leadingCtes + [ctes[i] for i in pending]),
+            ', '.join(counters[i] for i in pending)
+        )
+
+        counts = db_query(sql, tuple(withArgs) + tuple(args) * len(pending), using=using)[0]
+
+        for i, count in zip(pending, counts):
+            totals[i] += count
+
+        # Only the tables which filled an entire chunk may have rows left.
+        pending = [i for i, count in zip(pending, counts) if count >= chunkSize]
+
+    return totals
+
+
+def _chunkedDelete(table, condition, args, using, chunkSize=DELETE_CHUNK_SIZE):
+    """
+    Delete the rows of ``table`` matching ``condition`` in batches of at most ``chunkSize`` rows.
+
+    @return int Total number of rows deleted.
+    """
+    return _chunkedDeletes([(table, condition)], args, using=using, chunkSize=chunkSize)[0]
+
+
+def _subDeletes(table, userIdColumn, dependencies, using):
+    """
+    Determine the rows which must be deleted before the user rows of ``table`` can be.
+
+    @param dependencies dict Output of `discoverDependencies()`.
+
+    @return tuple of (independent, separate) lists of (table, condition) pairs, where each condition takes the user-ids
+        array as its only parameter.  The independent deletes may all go out in one statement (see
+        `_chunkedDeletes()`), the separate ones must each be issued on their own, in order, after them.
+    """
+    # List of (target, source, condition), where source is the table the condition selects from.
+    deletes = []
+
+    if table in _additionalRelations:
+        for fkTable, fkColumn, sourceTable in _additionalRelations[table]:
+            if shouldTableBeIgnoredForUserOperations(fkTable):
+                logging.debug(u'[%s] Skipping deletion from static table: %s', using, sourceTable)
+                continue
+
+            deletes.append((
+                sourceTable,
+                fkTable,
+                '''"{pk}" IN (SELECT "{fkColumn}" FROM "{fkTable}" WHERE "{userIdColumn}" = ANY(%s))'''.format(
+                    pk=getPrimaryKeyColumns(sourceTable, using=using)[0],
+                    fkColumn=fkColumn,
+                    fkTable=fkTable,
+                    userIdColumn=userIdColumn
+                )
+            ))
+
+    if table in dependencies:
+        # If there are additional dependents, delete them first.
+        for column, fkTable, fkColumn in dependencies[table]:
+            if shouldTableBeIgnoredForUserOperations(fkTable):
+                logging.debug(u'[%s] Skipping deletion from static table: %s', using, fkTable)
+                continue
+
+            deletes.append((
+                fkTable,
+                table,
+                '''"{fkColumn}" IN (SELECT "{column}" FROM "{table}" WHERE "{userIdColumn}" = ANY(%s))'''.format(
+                    fkColumn=fkColumn,
+                    column=column,
+                    table=table,
+                    userIdColumn=userIdColumn
+                )
+            ))
+
+    # NB: Every CTE in a statement sees the same snapshot, so a delete from a table which another one selects from
+    # (including a self-referencing foreign-key, where the target is ``table`` itself) can't be fused with it.
+    sources = [source for _, source, _ in deletes]
+    independent = []
+    separate = []
+
+    for i, (target, source, condition) in enumerate(deletes):
+        if target == table or target in sources[:i] + sources[i + 1:]:
+            separate.append((target, source, condition))
+        else:
+            independent.append((target, condition))
+
+    # A separate delete must not remove rows which a later one still has to select from, so those go last.
+    separateSources = set(source for target, source, _ in separate if target != source)
+    ordered = sorted(separate, key=lambda delete: delete[0] in separateSources)
+
+    return (independent, [(target, condition) for target, _, condition in ordered])
+
+
+@memoize
+def _deletePlan(using):
+    """
+    Work out everything about `deleteUsers()` on a connection which only depends on the schema.
+
+    @return tuple of (orderedPairs, cyclicPairs, subDeletes), where subDeletes is a dict of (table, userIdColumn) ->
+        (independent, separate) lists of (table, condition) pairs from `_subDeletes()`.
+    """
+    userIdTableColumnPairs = findTablesWithUserIdColumn(using=using)
+
+    dependencies = discoverDependencies([table for table, _ in userIdTableColumnPairs], using=using)
+
+    subDeletes = dict(
+        ((table, userIdColumn), _subDeletes(table, userIdColumn, dependencies, using))
+        for table, userIdColumn in userIdTableColumnPairs
+        if not shouldTableBeIgnoredForUserOperations(table)
+    )
+
+    orderedPairs, cyclicPairs = _tableDependencyOrder(userIdTableColumnPairs, using, True)
+
+    return (orderedPairs, cyclicPairs, subDeletes)
+
+
+def _fusedDeleteStatement(deletes, withSql=None):
+    """@return str Single (unchunked) statement which deletes the rows for every (table, condition) pair."""
+    ctes = ([withSql] if withSql is not None else []) + [
+        '"deleted{0}" AS (DELETE FROM "{1}" WHERE {2})'.format(i, table, condition)
+        for i, (table, condition) in enumerate(deletes)
+    ]
+    return 'WITH {0} SELECT 1'.format(', '.join(ctes))
+
+
+@memoize
+def _fusedDeleteSql(using):
+    """
+    Generate the whole of the `deleteUsers()` cascade for every table which can be ordered as one multi-statement
+    script, with the user-ids array bound for every %s.  Depends only on the schema, so is only generated once.
+    """
+    orderedPairs, _, subDeletes = _deletePlan(using)
+
+    statements = [
+        _fusedDeleteStatement(_cleanupDeletes, _cleanupWithSql),
+        'DELETE FROM "main_invitation" WHERE "owner_id" = ANY(%s)',
+    ]
+
+    for table, userIdColumn in orderedPairs:
+        if shouldTableBeIgnoredForUserOperations(table):
+            continue
+
+        independent, separate = subDeletes[(table, userIdColumn)]
+
+        if len(independent) > 0:
+            statements.append(_fusedDeleteStatement(independent))
+
+        statements.extend(_fusedDeleteStatement([delete]) for delete in separate)
+
+        statements.append('DELETE FROM "{0}" WHERE "{1}" = ANY(%s)'.format(table, userIdColumn))
+
+    return ';\n'.join(statements)
+
+
 def deleteUsers(userIds, using, **kw):
     """
     Completely delete a user and all of their data from a shard.
@@ -1353,25 +2303,43 @@ def deleteUsers(userIds, using, **kw):
         ''preCommitCb mixed Function or None.  Pre-commit callback function, invoked immediately before COMMIT.
         ``manageTransactions`` bool Defaults to True.  Flat to determine whether or not the function will manage the
             transaction.
+        ``deactivateTriggers`` bool Defaults to True.  Flag to determine whether or not triggers will be disabled while
+            the rows are deleted.
+        ``disableForeignKeyChecks`` bool Defaults to False.  Whether or not to skip foreign-key (and all other
+            non-ALWAYS trigger) processing while the rows are deleted, by running the deletion with
+            session_replication_role set to replica.  Avoids queueing a trigger event for every deleted row, but any
+            rows left referencing the deleted data will NOT be detected.  Requires superuser privileges.
+        ``fused`` bool Defaults to False.  Whether or not to delete from every table which can be ordered with a single
+            cached multi-statement script in one round-trip, instead of in bounded chunks (see `DELETE_CHUNK_SIZE`).
+            Best suited to users without very large amounts of data.
+        ``analyzeCleanedTables`` bool Defaults to False.  Whether or not to ANALYZE the tables emptied by the cleanup
+            deletes before the per-table deletes run, so their plans (and FK checks) don't assume rows which are gone.
+            Worthwhile for large batches, but ANALYZE locks the table against other ANALYZEs until COMMIT, which
+            serializes concurrent deletions on the same shard.
     """
     preCommitCb = kw.get('preCommitCb', None)
     manageTransactions = kw.get('manageTransactions', True)
+    deactivateTriggers = kw.get('deactivateTriggers', True)
+    disableForeignKeyChecks = kw.get('disableForeignKeyChecks', False)
+    fused = kw.get('fused', False)
+    analyzeCleanedTables = kw.get('analyzeCleanedTables', False)
 
     def ifManagingTransactionsThenExec(sql, using):
         """Will only execute the statement if ``manageTransactions`` is True."""
         if manageTransactions is True:
             db_exec(sql, using=using)
 
-    inUserIds = ','.join(map(str, userIds))
+    if len(userIds) == 0:
+        logging.info(u'deleteUsers: No user-ids, nothing to delete')
+        return True
 
-    userIdTableColumnPairs = findTablesWithUserIdColumn(using=using)
+    # Bound as a single array parameter, e.g. `"user_id" = ANY(%s)`.
+    userIdsArray = map(int, userIds)
 
-    dependencies = discoverDependencies(map(lambda x: x[0], userIdTableColumnPairs), using=using)
+    orderedPairs, cyclicPairs, subDeletes = _deletePlan(using)
+    ignoredTables = _ignoredTables()
 
-    clearedTables = []
-
-    origLen = len(userIdTableColumnPairs)
-    n = 0 # Count number of iterations since last success.
+    clearedTables = set()
 
     ifManagingTransactionsThenExec('BEGIN', using=using)
 
@@ -1379,190 +2347,70 @@ def deleteUsers(userIds, using, **kw):
     # http://www.postgresql.org/docs/devel/static/sql-set-constraints.html
     ifManagingTransactionsThenExec('SET CONSTRAINTS ALL DEFERRED', using=using)
 
-    # Temporary hacks.
-    sqls = [
-        '''
-        DELETE FROM "main_voicemailtranscription" WHERE "voiceMail_id" IN (
-            SELECT "id" FROM "main_voicemail" WHERE "user_id" IN ({0})
-        )
-        ''',
-        '''
-        DELETE FROM "main_groupshare" WHERE "invitation_ptr_id" IN (
-                SELECT "id" FROM "main_invitation" WHERE "user_id" IN ({0})
-            )
-        ''',
-        '''
-        DELETE FROM "main_groupshare" WHERE "invitation_ptr_id" IN (
-            SELECT "id" FROM "main_invitation" WHERE "owner_id" IN ({0})
-        )
-        ''',
-        '''
-        DELETE FROM "main_sendhubinvitation" WHERE "invitation_ptr_id" IN (
-            SELECT "id" FROM "main_invitation" WHERE "user_id" IN ({0})
-        )
-        ''',
-        '''
-        DELETE FROM "main_sendhubinvitation" WHERE "invitation_ptr_id" IN (
-            SELECT "id" FROM "main_invitation" WHERE "owner_id" IN ({0})
-        )
-        ''',
-        '''
-        DELETE FROM "main_enterpriseinvitation" WHERE "invitation_ptr_id" IN (
-            SELECT "id" FROM "main_invitation" WHERE "user_id" IN ({0})
-        )
-        ''',
-        '''
-        DELETE FROM "main_enterpriseinvitation" WHERE "invitation_ptr_id" IN (
-            SELECT "id" FROM "main_invitation" WHERE "owner_id" IN ({0})
-        )
-        ''',
-        '''
-        DELETE FROM "main_invitation" WHERE "owner_id" IN ({0})
-        ''',
-        '''
-        DELETE FROM "main_usermessage_contacts" WHERE "contact_id" IN (
-            SELECT "id" FROM "main_contact" WHERE "user_id" IN ({0})
-        )
-        ''',
-        '''
-        DELETE FROM "main_contact_groups" WHERE "contact_id" IN (
-            SELECT "id" FROM "main_contact" WHERE "user_id" IN ({0})
-        )
-        ''',
-        '''
-        DELETE FROM "main_contactparent" WHERE "contact_id" IN (
-            SELECT "id" FROM "main_contact" WHERE "user_id" IN ({0})
-        )
-        ''',
-        '''
-        DELETE FROM "main_usermessage_groups" WHERE "group_id" IN (
-            SELECT "id" FROM "main_group" WHERE "user_id" IN ({0})
-        )
-        ''',
-        '''
-        DELETE FROM "main_groupshortcode" WHERE "group_id" IN (
-            SELECT "id" FROM "main_group" WHERE "user_id" IN ({0})
-        )
-        ''',
-        '''
-        DELETE FROM "main_callobservation" WHERE "voiceCall" IN (
-            SELECT "id" FROM "main_voicecall" WHERE "user_id" IN ({0})
-        )
-        ''',
-        '''
-        DELETE FROM "main_voicecallrating" WHERE "voiceCall" IN (
-            SELECT "id" FROM "main_voicecall" WHERE "user_id" IN ({0})
-        )
-        ''',
-        '''
-        DELETE FROM "main_phonenumber" WHERE "id" IN (
-            SELECT "twilio_phone_number_id" FROM "main_extendeduser" WHERE "user_id" IN ({0})
-        )
-        ''',
-        '''
-        DELETE FROM "main_entitlement" WHERE "id" IN (
-            SELECT "entitlement_id" FROM "main_extendeduser" WHERE "user_id" IN ({0})
-        )
-        ''',
-        '''
-        DELETE FROM "main_receipt" WHERE "group_id" IN (
-            SELECT "id" FROM "main_group" WHERE "user_id" IN ({0})
+    if deactivateTriggers is True:
+        # NB: Unlike in `copyUsers`, this happens inside the transaction so a failed deletion rolls it back as well.
+        db_exec('ALTER TABLE "main_contact" DISABLE TRIGGER "main_contact_trigger"', using=using)
+
+    if disableForeignKeyChecks is True:
+        # NB: SET LOCAL only lasts until the end of the current transaction.
+        # @see http://www.postgresql.org/docs/devel/static/runtime-config-client.html
+        db_exec('SET LOCAL session_replication_role = replica', using=using)
+
+    if fused is True:
+        fusedSql = _fusedDeleteSql(using)
+        db_exec(fusedSql, (userIdsArray,) * fusedSql.count('%s'), using=using)
+        # Only the tables without a valid ordering remain.
+        orderedPairs = []
+
+    else:
+        # Temporary hacks, all in a single statement per batch.
+        _chunkedDeletes(
+            _cleanupDeletes,
+            (),
+            using=using,
+            withSql=_cleanupWithSql,
+            withArgs=(userIdsArray,) * _cleanupWithSql.count('%s')
         )
-        ''',
-    ]
-    map(lambda sql: db_exec(toSingleLine(sql.format(inUserIds)), using=using), sqls)
-    del sqls
 
-    savePoint = 0
+        # Only once the invitation subclass rows are gone, as the "invitations" CTE above reads from this table.
+        _chunkedDelete('main_invitation', '"owner_id" = ANY(%s)', (userIdsArray,), using=using)
 
-    while len(userIdTableColumnPairs) > 0:
-        logging.info(u'Number of table,column pairs remaining: {0}'.format(len(userIdTableColumnPairs)))
-        n += 1
-        if n > origLen * 2:
-            logging.info(u'userIdTableColumnPairs={0}'.format(userIdTableColumnPairs))
-            raise Exception('Dependency cycle detected')
+        if analyzeCleanedTables is True:
+            # NB: ANALYZE run inside the transaction doesn't count the rows it has deleted itself.
+            for table in _cleanupAnalyzeTables:
+                db_exec('ANALYZE "{0}"'.format(table), using=using)
 
-        table, userIdColumn = userIdTableColumnPairs.pop(0)
+    def deleteTable(table, userIdColumn):
+        """Delete the rows belonging to ``userIds`` from a single table, along with the rows depending on them."""
+        if table in ignoredTables:
+            logging.debug(u'[%s] Skipping deletion from static table: %s', using, table)
+            return
 
-        if shouldTableBeIgnoredForUserOperations(table):
-            logging.debug(u'[{0}] Skipping deletion from static table: {1}'.format(using, table))
-            continue
+        logging.info(u'[%s] Deleting from table: %s', using, table)
 
-        logging.info(u'[{0}] Deleting from table: {1}'.format(using, table))
+        independent, separate = subDeletes[(table, userIdColumn)]
 
-        try:
-            savePoint += 1
-            db_exec('SAVEPOINT save{0}'.format(savePoint), using=using)
-
-            if table in _additionalRelations:
-                for fkTable, fkColumn, sourceTable in _additionalRelations[table]:
-                    if shouldTableBeIgnoredForUserOperations(fkTable):
-                        logging.debug(u'[{0}] Skipping deletion from static table: {1}'.format(using, sourceTable))
-                        continue
-
-                    logging.info(u'[{0}] Deleting from subtable: {1}'.format(using, sourceTable))
-
-                    deleteSql = toSingleLine(
-                        '''
-                            DELETE FROM "{sourceTable}" WHERE "{pk}" IN (
-                                SELECT "{fkColumn}" FROM "{fkTable}" WHERE "{userIdColumn}" IN ({userIds})
-                            )
-                        '''.format(
-                            sourceTable=sourceTable,
-                            pk=getPrimaryKeyColumns(sourceTable)[0],
-                            fkColumn=fkColumn,
-                            fkTable=fkTable,
-                            userIdColumn=userIdColumn,
-                            userIds=inUserIds
-                        )
-                    )
-                    db_exec(deleteSql, using=using)
-
-            if table in dependencies:
-                # If there are additional dependents, delete them first.
-                for column, fkTable, fkColumn in dependencies[table]:
-                    if shouldTableBeIgnoredForUserOperations(fkTable):
-                        logging.debug(u'[{0}] Skipping deletion from static table: {1}'.format(using, fkTable))
-                        continue
-
-                    logging.info(u'[{0}] Deleting from subtable: {1}'.format(using, fkTable))
-
-                    deleteSql = toSingleLine(
-                        '''
-                            DELETE FROM "{fkTable}" WHERE "{fkColumn}" IN (
-                                SELECT "{column}" FROM "{table}" WHERE "{userIdColumn}" IN ({userIds})
-                            )
-                        '''.format(
-                            fkTable=fkTable,
-                            fkColumn=fkColumn,
-                            column=column,
-                            table=table,
-                            userIdColumn=userIdColumn,
-                            userIds=inUserIds
-                        )
-                    )
-                    db_exec(deleteSql, using=using)
-
-            deleteSql = toSingleLine(
-                '''DELETE FROM "{0}" WHERE "{1}" IN ({2})'''.format(table, userIdColumn, inUserIds)
-            )
-            db_exec(deleteSql, using=using)
+        if logging.getLogger().isEnabledFor(logging.INFO) and len(independent) + len(separate) > 0:
+            logging.info(u'[%s] Deleting from subtables: %s', using, [target for target, _ in independent + separate])
 
-            clearedTables.append(table)
+        # The independent sub-deletes go out together, the rest one statement at a time.
+        if len(independent) > 0:
+            _chunkedDeletes(independent, (userIdsArray,), using=using)
 
-            db_exec('RELEASE SAVEPOINT save{0}'.format(savePoint), using=using)
-            # Reset cycle detector counter.
-            n = 0
+        for target, condition in separate:
+            _chunkedDelete(target, condition, (userIdsArray,), using=using)
 
-        except Exception, e:
-            logging.info(
-                u'[{0}] Dealing with IntegrityError -----\n{1}----- for table={2}/userIdColumn={3}'
-                .format(using, e, table, userIdColumn)
-            )
-            db_exec('ROLLBACK TO save{0}'.format(savePoint), using=using)
-            userIdTableColumnPairs.append((table, userIdColumn))
-            if 'waits for ShareLock on transaction' in str(e):
-                raise e
+        _chunkedDelete(table, '''"{0}" = ANY(%s)'''.format(userIdColumn), (userIdsArray,), using=using)
+
+        clearedTables.add(table)
+
+    _runInDependencyOrder(orderedPairs, cyclicPairs, deleteTable, using=using, trackedTables=clearedTables)
+
+    if disableForeignKeyChecks is True:
+        db_exec('SET LOCAL session_replication_role = DEFAULT', using=using)
+
+    if deactivateTriggers is True:
+        db_exec('ALTER TABLE "main_contact" ENABLE TRIGGER "main_contact_trigger"', using=using)
 
     try:
         # Set constraints to all immediate, which will be applied retroactively
@@ -1574,7 +2422,7 @@ def deleteUsers(userIds, using, **kw):
             logging.info(u'deleteUser invoking pre-commit callback')
             preCommitCb()
 
-        logging.info(u'Committing deletion on {0}'.format(using))
+        logging.info(u'Committing deletion on %s', using)
         ifManagingTransactionsThenExec('COMMIT', using=using)
 
         return True
@@ -1585,6 +2433,56 @@ def deleteUsers(userIds, using, **kw):
 
 
 def deleteUser(userId, using, **kw):
-    """Delete a single user."""
+    """
+    Delete a single user.
+
+    NB: Deprecated for deleting more than one user, each call is a complete transaction with a round-trip per table;
+    use `deleteUsers()` with all of the user-ids or a `BatchUserDeleter` instead.
+    """
     return deleteUsers([userId], using, **kw)
 
+
+class BatchUserDeleter(object):
+    """
+    Buffers user-ids and deletes them with a single `deleteUsers()` call per batch, rather than a transaction per user.
+
+    Usage:
+
+        deleter = BatchUserDeleter('shard_1')
+        for userId in userIds:
+            deleter.add(userId)
+        deleter.flush()
+    """
+    def __init__(self, using, maxUsers=100, maxAgeSeconds=30, **kw):
+        """
+        @param using str Database connection handle to use.
+        @param maxUsers int Defaults to 100.  Flush once this many user-ids have been buffered.
+        @param maxAgeSeconds int Defaults to 30.  Flush (on the next `add()`) once the oldest buffered user-id has
+            waited this long.
+        @param **kw Dict of optional arguments passed through to `deleteUsers()`.
+        """
+        self.using = using
+        self.maxUsers = maxUsers
+        self.maxAgeSeconds = maxAgeSeconds
+        self.kw = kw
+        self.userIds = []
+        self.startedTs = None
+
+    def add(self, userId):
+        """Buffer a user-id for deletion, flushing the batch if it is now full or too old."""
+        if len(self.userIds) == 0:
+            self.startedTs = time.time()
+
+        self.userIds.append(userId)
+
+        if len(self.userIds) >= self.maxUsers or time.time() - self.startedTs >= self.maxAgeSeconds:
+            self.flush()
+
+    def flush(self):
+        """Delete all of the buffered user-ids."""
+        if len(self.userIds) == 0:
+            return
+
+        userIds, self.userIds = self.userIds, []
+        deleteUsers(userIds, self.using, **self.kw)
+
@@ -4,7 +4,8 @@
 
 __author__ = 'Jay Taylor [@jtaylor]'
 
-import logging, re, settings #, time
+import logging, re, settings, weakref #, time
+from ..functional import memoize
 from ..text import toSingleLine
 
 
@@ -77,34 +78,25 @@ def tableDescriptionToDbLinkT(description, columns='*'):
     't("id" integer, "name" character varying(128))'
     """
     # Assert that description is in expected format.
-    assert len(description) > 0 and all(map(lambda row: len(row) == 2, description))
+    assert len(description) > 0 and all(len(row) == 2 for row in description)
     assert 'column' in description[0] if hasattr(description, 'keys') else True
 
-    def _resolveColumnTypePairs(columns):
-        """Resolve a columns specifier to a list of tuples of (column, type)."""
-        # NB: r stands for 'row'.
-        getColumn = lambda r: r['column'] if hasattr(r, 'keys') else r[0]
-        getType = lambda r: r['type'] if hasattr(r, 'keys') else r[1]
-
-        if columns == '*':
-            columnNames = map(getColumn, description)
-        elif isinstance(columns, str) or isinstance(columns, unicode):
-            columnNames = columns.split(',')
-        elif hasattr(columns, '__iter__'):
-            columnNames = columns
-        else:
-            raise Exception('Unexpecte columns value: {0}'.format(columns))
+    # NB: The rows are either all dicts or all tuples.
+    if hasattr(description[0], 'keys'):
+        pairs = [(row['column'], row['type']) for row in description]
+    else:
+        pairs = [(row[0], row[1]) for row in description]
 
-        # Prepare/organize output:
-        result = map(
-            lambda row: (getColumn(row), getType(row)),
-            filter(lambda row: getColumn(row) in columnNames, description)
-        )
-        return result
+    if columns != '*':
+        if isinstance(columns, (str, unicode)):
+            columns = columns.split(',')
+        elif not hasattr(columns, '__iter__'):
+            raise Exception('Unexpected columns value: {0}'.format(columns))
 
-    pairs = _resolveColumnTypePairs(columns)
+        wanted = frozenset(columns)
+        pairs = [(column, dataType) for column, dataType in pairs if column in wanted]
 
-    return 't({0})'.format(', '.join(map(lambda (c, t): '"{0}" {1}'.format(c.strip('"'), t), pairs)))
+    return 't({0})'.format(', '.join('"{0}" {1}'.format(column.strip('"'), dataType) for column, dataType in pairs))
 
 
 def pgStripDoubleQuotes(s):
@@ -125,11 +117,27 @@ def pgGetPersistentConnectionHandles(using):
     return handles
 
 
+# Persistent dblink handles known to be connected, for each underlying DBAPI connection (i.e. database session).
+# Forgotten automatically along with the connection, as dblinks don't outlive the session either.
+_connectedDbLinkHandles = weakref.WeakKeyDictionary()
+
+
+def _knownDbLinkHandles(using):
+    """@return set of persistent dblink handles known to be connected in the invoking thread's session for ``using``."""
+    from . import dbapiConnection
+
+    connection = dbapiConnection(using)
+    if connection not in _connectedDbLinkHandles:
+        _connectedDbLinkHandles[connection] = set()
+    return _connectedDbLinkHandles[connection]
+
+
 def pgConnectPersistentDbLink(using, handle, psqlConnectionString):
     """Create a single persistent dblink connection."""
     from . import db_exec
     logging.info(u'Connecting persistent dblink "{0}" on connection {1}'.format(handle, using))
     db_exec('''SELECT dblink_connect('{0}', '{1}')'''.format(handle, psqlConnectionString), using=using)
+    _knownDbLinkHandles(using).add(handle)
 
 
 def pgConnectPersistentDbLinks(using, *handles, **custom):
@@ -137,6 +145,9 @@ def pgConnectPersistentDbLinks(using, *handles, **custom):
     Verify that a persistent dblink connection exists for each of the named connections.  For any connection which
     doesn't have a persistent dblink already, create it.
 
+    Handles which were already verified or connected in the current database session are remembered, so once they all
+    are this doesn't need to query the database at all.
+
     NB: Take care to ensure that custom handles don't conflict with connection names.
 
     @param using string Connection name to connect the dblinks to.
@@ -153,24 +164,31 @@ def pgConnectPersistentDbLinks(using, *handles, **custom):
 
     connectionNames = connections()
 
-    alreadyConnected = pgGetPersistentConnectionHandles(using=using) or []
-
     for c in handles:
         assert c in connectionNames, 'Connection "{0}" was not found in connections ({1})' \
             .format(c, connectionNames)
 
+    knownHandles = _knownDbLinkHandles(using)
+    if knownHandles.issuperset(handles) and knownHandles.issuperset(custom.keys()):
+        return
+
+    alreadyConnected = pgGetPersistentConnectionHandles(using=using) or []
+
     # Generate a single statement to connect to all dblinks.
-    connectStatements = map(
-        lambda c: '''dblink_connect('{0}', '{1}')'''.format(c, getPsqlConnectionString(c)),
-        filter(lambda c: c not in alreadyConnected, handles)
-    ) + map(
-        lambda c, psqlConnectionString: '''dblink_connect('{0}', '{1}')'''.format(c, psqlConnectionString),
-        filter(lambda c, _: c not in alreadyConnected, custom.items())
-    )
+    connectStatements = [
+        '''dblink_connect('{0}', '{1}')'''.format(c, getPsqlConnectionString(c))
+        for c in handles if c not in alreadyConnected
+    ] + [
+        '''dblink_connect('{0}', '{1}')'''.format(c, psqlConnectionString)
+        for c, psqlConnectionString in custom.items() if c not in alreadyConnected
+    ]
     if len(connectStatements) > 0:
         sql = 'SELECT {0}'.format(', '.join(connectStatements))
         db_query(sql, using=using)
 
+    knownHandles.update(handles)
+    knownHandles.update(custom.keys())
+
 
 def _resolveConnectionsOrShards(connections=None):
     """
@@ -213,7 +231,8 @@ def evaluatedDistributedSelect(
     using='default',
     includeShardInfo=False,
     connections=None,
-    usePersistentDbLink=None
+    usePersistentDbLink=None,
+    asyncDbLink=None
 ):
     """
     Generate and then evaluate a distributed query.
@@ -226,6 +245,9 @@ def evaluatedDistributedSelect(
         of new dblink connections.  This can result in an overall speedup when many dblink queries will be executed, at
         the cost to initialize and always check that the persistent dblink connections exist.
 
+    @param asyncDbLink boolean Defaults to None.  If True or enabled by settings configuration, then the shards are
+        queried concurrently (see `distributedSelect()`).  Implies `usePersistentDbLink`.
+
     @return list Evaluated result of distributed select.
     """
     from . import db_query
@@ -234,15 +256,22 @@ def evaluatedDistributedSelect(
         args = tuple()
 
     # Use supplied value if not None, otherwise read from environment.
-    usePersistentDbLink = usePersistentDbLink if usePersistentDbLink is not None \
+    asyncDbLink = asyncDbLink if asyncDbLink is not None else getattr(settings, 'SH_UTIL_USE_ASYNC_DBLINK', False)
+
+    usePersistentDbLink = True if asyncDbLink is True \
+        else usePersistentDbLink if usePersistentDbLink is not None \
         else getattr(settings, 'SH_UTIL_USE_PERSISTENT_DBLINK', False)
 
+    # Kept for draining the dblinks after an asynchronous select.
+    selectSql = sql
+
     sql, args = distributedSelect(
         sql=sql,
         args=args,
         includeShardInfo=includeShardInfo,
         connections=connections,
-        usePersistentDbLink=usePersistentDbLink
+        usePersistentDbLink=usePersistentDbLink,
+        asyncDbLink=asyncDbLink
     )
 
     #logging.info(u'usePersistentDbLink={0}'.format(usePersistentDbLink))
@@ -250,62 +279,85 @@ def evaluatedDistributedSelect(
     if usePersistentDbLink is not False:
         pgInitializeDbLinks(using, connections)
 
-    return db_query(sql, args, using=using, as_dict=asDict)
+    if asyncDbLink is not True:
+        return db_query(sql, args, using=using, as_dict=asDict)
 
+    try:
+        result = db_query(sql, args, using=using, as_dict=asDict)
 
-_stringArgumentFinder = re.compile(r'%s')
+        # An outer LIMIT can finish the query before every dblink_get_result() was read, which would leave the
+        # persistent dblinks busy ("another command is already in progress") for the next query sent on them.
+        _, dbLinkT, _, _, _ = _analyzeDistributedSelect(toSingleLine(selectSql).rstrip(';'), includeShardInfo)
+        db_query(_drainAsyncDbLinksSql(_resolveConnectionsOrShards(connections), dbLinkT), using=using)
+
+        return result
+
+    except Exception:
+        # A failure part way through can leave sent queries un-collected, which would make the persistent dblinks
+        # unusable; drop them so they are re-established next time.
+        _pgDisconnectPersistentDbLinks(using, connections)
+        raise
 
-_offsetLimitRe = re.compile(r'(:?OFFSET|LIMIT)\s+\d+', re.I)
 
-def distributedSelect(sql, args=None, includeShardInfo=False, connections=None, usePersistentDbLink=None, alias='q0'):
+def _drainAsyncDbLinksSql(shards, dbLinkT):
     """
-    Generate a distributed query and associated args.  Note: when there is only one connection (or shard), the same
-    sql/args will be returned to avoid doing unnecessary work.
+    Generate a statement which reads whatever is left of an asynchronous distributed select from each of the
+    ``shards``: any un-collected result followed by the final empty one.  Reading an already drained dblink just
+    returns nothing, so this is safe to run regardless of how far the select got.
+    """
+    if isinstance(shards, dict):
+        shards = shards.keys()
 
-    NB: Due to the dynamic nature of this mechanism, it will not work with joins.  Only use standard SELECT statements,
-        without subqueries.
+    return 'SELECT {0}'.format(', '.join(
+        '''(SELECT COUNT(*) FROM dblink_get_result('{0}') AS {1})'''.format(shard, dbLinkT)
+        for shard in shards
+        for _ in xrange(2)
+    ))
 
-    @param args Positional arguments.
 
-    @param includeShardInfo bool Defaults to False.  Whether or not to include a "shardId" column in the results.
+def _pgDisconnectPersistentDbLinks(using, connections=None):
+    """Best-effort disconnection of the persistent dblinks for one or more connections."""
+    from . import db_query
 
-    @param connections mixed List of connection names or Dict of handle->psqlConnectionString.  Defaults to None.  If
-        None, all primary shard connections will be used.
+    handles = _resolveConnectionsOrShards(connections)
+    if isinstance(handles, dict):
+        handles = handles.keys()
 
-    @param usePersistentDbLink boolean Defaults to None.  If True or enabled by configuration the generated query will
-        use persistent named dblink connections instead of new dblink connections.  This can result in an overall
-        speedup when many dblink queries are executed, at the cost of initializing and always checking that the
-        persistent dblink connections exist.
-    """
-    import sqlparse
-    from sqlparse.sql import Identifier, IdentifierList, Function, Where
-    from sqlparse.tokens import Keyword, Wildcard
-    from . import getPsqlConnectionString
-    #startedTs = time.time()
+    try:
+        _knownDbLinkHandles(using).difference_update(handles)
 
-    sql = toSingleLine(sql)
+        alreadyConnected = pgGetPersistentConnectionHandles(using=using) or []
+        disconnectStatements = [
+            '''dblink_disconnect('{0}')'''.format(handle) for handle in handles if handle in alreadyConnected
+        ]
+        if len(disconnectStatements) > 0:
+            db_query('SELECT {0}'.format(', '.join(disconnectStatements)), using=using)
 
-    if args is None:
-        args = tuple()
+    except Exception, e:
+        logging.warn(u'Failed to disconnect persistent dblinks on connection %s: %s', using, e)
 
-    # Remove trailing semicolons from sql.
-    sql = sql.rstrip(';')
 
-    shards = _resolveConnectionsOrShards(connections)
-    if isinstance(shards, dict):
-        # Only interested in the connection handles.
-        shards = shards.keys()
+_stringArgumentFinder = re.compile(r'%s')
 
-    # ALWAYS USE DBLINK: this is because this produces different result
-    # sets (ex: dblink returns table names in the result set)
-    # which makes for shitty special case programming
-    #if len(shards) == 1: # and includeShardInfo is False:
-    #    # Is it desirable to use DB-Link when there is only 1 shard? No..
-    #    return (sql, args)
+_offsetLimitRe = re.compile(r'(:?OFFSET|LIMIT)\s+\d+', re.I)
 
-    # Use supplied value if not None, otherwise read from environment.
-    usePersistentDbLink = usePersistentDbLink if usePersistentDbLink is not None \
-        else getattr(settings, 'SH_UTIL_USE_PERSISTENT_DBLINK', False)
+_fromKeywordRe = re.compile(r'([\n ])FROM([\n ])')
+
+
+@memoize
+def _analyzeDistributedSelect(sql, includeShardInfo):
+    """
+    Parse a (single-line, semicolon-free) SELECT statement and work out everything `distributedSelect()` needs which
+    only depends on the statement itself, so repeated queries skip sqlparse and the per-identifier catalog lookups.
+
+    Cleared along with the reflection caches by `data.clearSchemaCaches()`.
+
+    @return tuple of (innerIdentifiers, dbLinkT, remappedIdentifiers, outerRemappedIdentifiers, groupingTail), where
+        outerRemappedIdentifiers is None when there are no innerIdentifiers.
+    """
+    import sqlparse
+    from sqlparse.sql import Identifier, IdentifierList, Function, Where
+    from sqlparse.tokens import Keyword, Wildcard
 
     parsed = sqlparse.parse(sql)[0]
 
@@ -547,44 +599,6 @@ def distributedSelect(sql, args=None, includeShardInfo=False, connections=None,
 
         return remapped
 
-    def _prepareDbLinkQuery(sql, extraIdentifiers):
-        """
-        Double-quotes strings inside the dblink query.
-
-        @param extraIdentifiers list of extra tokens to append to select clause.
-        """
-        # @FIXME This breaks for queries with incidential '%s' substrings, e.g.: .. LIKE '%super%'
-
-        def positionalCallback(match):
-            """
-            Regex callback to determine the %s position and apply additional
-            quotes if appropriate depending on the arg type.
-            """
-            try:
-                #logging.debug('sql={0}'.format(sql))
-                #logging.debug('args={0}'.format(args))
-                #logging.debug('pos={0}'.format(positionalCallback.position))
-                if not any(map(lambda t: isinstance(args[positionalCallback.position], t), (int, long, bool))):
-                    # Add extra set of single quotes, which will become ''arg''
-                    # once the db adds additional quotes.
-                    return "''{0}''".format(match.group(0))
-                return match.group(0)
-
-            finally:
-                positionalCallback.position += 1
-
-        positionalCallback.position = 0
-
-        # First, change all existing single quotes to 2 single quotes.
-        dbLinkSql = sql.replace("'", "''")
-
-        if len(args) > 0:
-            # Then add 2 single quotes around any %s string arguments.
-            dbLinkSql = _stringArgumentFinder.sub(positionalCallback, dbLinkSql)
-
-        return re.sub(r'([\n ])FROM([\n ])', r', {0}\1FROM\2'.format(', '.join(extraIdentifiers)), dbLinkSql, 1) \
-            if len(extraIdentifiers) > 0 else dbLinkSql
-
     def _prepareGroupingTail(identifiers, table, listOfReferencedTables, outerWhereTail):
         """Identify and extract grouping clause to generate outer query grouping clause."""
         # For counts or sums where that was the only thing queried, chop off the
@@ -642,29 +656,148 @@ def distributedSelect(sql, args=None, includeShardInfo=False, connections=None,
 
     groupingTail = _prepareGroupingTail(*stdArgs, outerWhereTail=outerWhereTail)
 
+    if len(innerIdentifiers) > 0:
+        # Sometimes count(*) needs to be remapped to sum(*) in the outermost query.
+        outerRemappedIdentifiers = \
+            _remapFunctionIdentifiers(*stdArgs, stripFunctions=True) + (['shard'] if includeShardInfo is True else [])
+    else:
+        outerRemappedIdentifiers = None
+
+    return (innerIdentifiers, dbLinkT, remappedIdentifiers, outerRemappedIdentifiers, groupingTail)
+
+
+def distributedSelect(
+    sql,
+    args=None,
+    includeShardInfo=False,
+    connections=None,
+    usePersistentDbLink=None,
+    alias='q0',
+    asyncDbLink=None
+):
+    """
+    Generate a distributed query and associated args.  Note: when there is only one connection (or shard), the same
+    sql/args will be returned to avoid doing unnecessary work.
+
+    NB: Due to the dynamic nature of this mechanism, it will not work with joins.  Only use standard SELECT statements,
+        without subqueries.
+
+    @param args Positional arguments.
+
+    @param includeShardInfo bool Defaults to False.  Whether or not to include a "shardId" column in the results.
+
+    @param connections mixed List of connection names or Dict of handle->psqlConnectionString.  Defaults to None.  If
+        None, all primary shard connections will be used.
+
+    @param usePersistentDbLink boolean Defaults to None.  If True or enabled by configuration the generated query will
+        use persistent named dblink connections instead of new dblink connections.  This can result in an overall
+        speedup when many dblink queries are executed, at the cost of initializing and always checking that the
+        persistent dblink connections exist.
+
+    @param asyncDbLink boolean Defaults to None.  If True or enabled by configuration, then the generated SQL first
+        sends the query to every shard with `dblink_send_query()` and only then collects the results with
+        `dblink_get_result()`, so the shards all work at the same time instead of one after another.  The result is a
+        two-statement script; the rows come from the second statement.  Implies `usePersistentDbLink`, as only named
+        dblink connections can be queried asynchronously.  NB: An outer LIMIT may leave results un-collected, so
+        callers running the SQL themselves must drain the dblinks afterwards (see `evaluatedDistributedSelect()`).
+    """
+    from . import getPsqlConnectionString
+    #startedTs = time.time()
+
+    sql = toSingleLine(sql)
+
+    if args is None:
+        args = tuple()
+
+    # Remove trailing semicolons from sql.
+    sql = sql.rstrip(';')
+
+    shards = _resolveConnectionsOrShards(connections)
+    if isinstance(shards, dict):
+        # Only interested in the connection handles.
+        shards = shards.keys()
+
+    # ALWAYS USE DBLINK: this is because this produces different result
+    # sets (ex: dblink returns table names in the result set)
+    # which makes for shitty special case programming
+    #if len(shards) == 1: # and includeShardInfo is False:
+    #    # Is it desirable to use DB-Link when there is only 1 shard? No..
+    #    return (sql, args)
+
+    # Use supplied value if not None, otherwise read from environment.
+    asyncDbLink = asyncDbLink if asyncDbLink is not None else getattr(settings, 'SH_UTIL_USE_ASYNC_DBLINK', False)
+
+    usePersistentDbLink = True if asyncDbLink is True \
+        else usePersistentDbLink if usePersistentDbLink is not None \
+        else getattr(settings, 'SH_UTIL_USE_PERSISTENT_DBLINK', False)
+
+    innerIdentifiers, dbLinkT, remappedIdentifiers, outerRemappedIdentifiers, groupingTail = \
+        _analyzeDistributedSelect(sql, includeShardInfo)
+
+    def _prepareDbLinkQuery(sql, extraIdentifiers):
+        """
+        Double-quotes strings inside the dblink query.
+
+        @param extraIdentifiers list of extra tokens to append to select clause.
+        """
+        # @FIXME This breaks for queries with incidential '%s' substrings, e.g.: .. LIKE '%super%'
+
+        # First, change all existing single quotes to 2 single quotes.
+        dbLinkSql = sql.replace("'", "''")
+
+        if len(args) > 0:
+            # Then add 2 single quotes around any %s string arguments, which will become ''arg'' once the db adds
+            # additional quotes.  The placeholders are worked out up front from the argument types, in order.
+            parts = _stringArgumentFinder.split(dbLinkSql)
+            placeholders = [
+                '%s' if isinstance(args[i], (int, long, bool)) else "''%s''" for i in xrange(len(parts) - 1)
+            ] + ['']
+            dbLinkSql = ''.join(part + placeholder for part, placeholder in zip(parts, placeholders))
+
+        return _fromKeywordRe.sub(r', {0}\1FROM\2'.format(', '.join(extraIdentifiers)), dbLinkSql, 1) \
+            if len(extraIdentifiers) > 0 else dbLinkSql
+
     # Get SQL with single quotes -> double single quotes.
     dbLinkSql = _prepareDbLinkQuery(sql, innerIdentifiers)
+
+    # Interpolate the args once here, rather than into the whole statement after it has been repeated for every shard.
+    dbLinkSql = dbLinkSql % tuple(args)
     #logging.info('usePersistentDbLink={}'.format(usePersistentDbLink))
 
-    multiShardSql = '\nUNION ALL\n'.join(
-        map(
-            lambda shard: '''SELECT *{maybeSelectShardId} FROM ''' \
-                '''dblink('{connectionString}', '{dbLinkSql}') AS {tClause}'''.format(
-                maybeSelectShardId=''', '{0}' AS "shard"'''.format(shard) if includeShardInfo is True else '',
+    if asyncDbLink is True:
+        sendSql = 'SELECT {0};\n'.format(', '.join(
+            '''dblink_send_query('{0}', '{1}')'''.format(shard, dbLinkSql) for shard in shards
+        ))
+
+        # NB: dblink_get_result() must be invoked once more per connection to consume the end of the results before
+        # the connection can be used again, these come after all of the real results and never return any rows.
+        resultSources = [(shard, '''dblink_get_result('{0}')'''.format(shard)) for shard in shards] * 2
+
+    else:
+        sendSql = ''
+
+        resultSources = [
+            (
+                shard,
                 # Generate the dblink connection string if not using persistent, otherwise just use the connection name.
-                connectionString=getPsqlConnectionString(shard) if not usePersistentDbLink else shard,
-                dbLinkSql=dbLinkSql,
-                tClause=dbLinkT
-            ),
-            shards
+                '''dblink('{0}', '{1}')'''.format(
+                    getPsqlConnectionString(shard) if not usePersistentDbLink else shard,
+                    dbLinkSql
+                )
+            )
+            for shard in shards
+        ]
+
+    multiShardSql = '\nUNION ALL\n'.join(
+        '''SELECT *{maybeSelectShardId} FROM {source} AS {tClause}'''.format(
+            maybeSelectShardId=''', '{0}' AS "shard"'''.format(shard) if includeShardInfo is True else '',
+            source=source,
+            tClause=dbLinkT
         )
+        for shard, source in resultSources
     )
 
     if len(innerIdentifiers) > 0:
-        # Sometimes count(*) needs to be remapped to sum(*) in the outermost query.
-        outerRemappedIdentifiers = \
-            _remapFunctionIdentifiers(*stdArgs, stripFunctions=True) + (['shard'] if includeShardInfo is True else [])
-
         distributedSql = 'SELECT {outerRemapped}\n' \
             'FROM (SELECT {remapped}, {inner} FROM (\n{multiShardSql}\n) {alias} {tail}) q1'.format(
             outerRemapped=', '.join(outerRemappedIdentifiers),
@@ -694,14 +827,15 @@ def distributedSelect(sql, args=None, includeShardInfo=False, connections=None,
     #finishedTs = time.time()
     #logging.info(u'distributedSelect took {0}'.format(finishedTs - startedTs))
     if settings.DEBUG is True:
-        logging.debug(u'IN: {0}'.format(sql))
-        logging.debug(u'OUT: {0}'.format(distributedSql))
+        logging.debug(u'IN: %s', sql)
+        logging.debug(u'OUT: %s', distributedSql)
 
     #from django_util.log_errors import print_stack
     #logging.debug('[distributedSelect stack]')
     #logging.debug(print_stack())
 
-    return (distributedSql % (args * len(shards))).replace('%', '%%'), tuple()
+    # NB: Everything has already been interpolated, so escape any remaining `%` characters from the driver.
+    return (sendSql + distributedSql).replace('%', '%%'), tuple()
 
 
 # Some aggregate functions require remapping in the outermost part of the distributed query to produce the expected
@@ -746,8 +880,8 @@ _identifierParserRe = re.compile(
 )
 
 _functionParserRe = re.compile(
-    r'''^(?P<function>{0})\(\s*(?P<arg1>.*?)(?P<rest>(?:\s*,\s*.*?\s*)*)\)$''' \
-        .format('|'.join(_sqlFunctionTypeMappings.keys())),
+    r'''^(?P<function>{0})\(\s*(?P<arg1>.*?)(?P<rest>(?:\s*,\s*.*?\s*)*)\s*\)$''' \
+        .format('|'.join(map(re.escape, _sqlFunctionTypeMappings.keys()))),
     re.I
 )
 
@@ -847,7 +981,7 @@ def parseIdentifier(identifierFragment, table=None, listOfReferencedTables=None)
                 out['type'] = returnType[0][0]
 
         if 'type' not in out:
-            logging.warn(u'[WARN] distributed.parseIdentifier type inference failed, out={0}'.format(out))
+            logging.warn(u'[WARN] distributed.parseIdentifier type inference failed, out=%s', out)
 
     _attemptTypeInference()
 
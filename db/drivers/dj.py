@@ -90,6 +90,99 @@ def db_exec(sql, args=None, using='default', force=False, debug=False):
     return result
 
 
+def db_exec_raw(sql, using='default', force=False, debug=False):
+    """
+    Execute SQL verbatim on the requested database connection, without any parameter interpolation (so literal `%`
+    characters need no escaping).
+
+    @param force boolean Defaults to False. Whether or not to force the named connection to be used.
+    """
+    from ..import DEBUG
+
+    if force is False:
+        using = getRealShardConnectionName(using)
+
+    if DEBUG is True or debug is True:
+        logging.info(u'-- [DEBUG] DB_EXEC_RAW, using={0} ::\n{1}'.format(using, sql))
+
+    # NB: Django always hands params to the driver, so go straight to the underlying psycopg2 connection (opening it
+    # first if necessary).  psycopg2 only interpolates when params are given.
+    connections()[using].cursor().close()
+    cursor = connections()[using].connection.cursor()
+    cursor.execute(sql)
+
+    cursor.close()
+
+
+def db_copy(sql, file, using='default', force=False, debug=False):
+    """
+    Execute a `COPY ... TO STDOUT` or `COPY ... FROM STDIN` statement, streaming the data to/from a file-like object.
+
+    @param file File-like object to write the data to (TO STDOUT) or read the data from (FROM STDIN).
+    @param force boolean Defaults to False. Whether or not to force the named connection to be used.
+    """
+    from ..import DEBUG
+
+    if force is False:
+        using = getRealShardConnectionName(using)
+
+    if DEBUG is True or debug is True:
+        logging.info(u'-- [DEBUG] DB_COPY, using={0} ::\n{1}'.format(using, sql))
+
+    cursor = connections()[using].cursor()
+    cursor.copy_expert(sql, file)
+
+    cursor.close()
+
+
+def dbapiConnection(using='default', force=False):
+    """
+    Get the invoking thread's underlying psycopg2 connection for a connection name, opening it if necessary.  The same
+    object is returned for as long as the database session lasts.
+
+    @param force boolean Defaults to False. Whether or not to force the named connection to be used.
+    """
+    if force is False:
+        using = getRealShardConnectionName(using)
+
+    # NB: Django only opens the underlying psycopg2 connection on first use.
+    connections()[using].cursor().close()
+    return connections()[using].connection
+
+
+def isInTransaction(using='default', force=False):
+    """
+    Check whether the invoking thread's handle for a connection has a transaction open (or aborted), without a round-trip.
+
+    @param force boolean Defaults to False. Whether or not to force the named connection to be used.
+
+    @return True if a ROLLBACK/COMMIT is outstanding, otherwise False.
+    """
+    from psycopg2.extensions import TRANSACTION_STATUS_INERROR, TRANSACTION_STATUS_INTRANS
+
+    if force is False:
+        using = getRealShardConnectionName(using)
+
+    # NB: Django only opens the underlying psycopg2 connection on first use.
+    connection = connections()[using].connection
+    if connection is None:
+        return False
+
+    return connection.get_transaction_status() in (TRANSACTION_STATUS_INTRANS, TRANSACTION_STATUS_INERROR)
+
+
+def closeConnection(using='default', force=False):
+    """
+    Close the invoking thread's handle for a connection.
+
+    @param force boolean Defaults to False. Whether or not to force the named connection to be used.
+    """
+    if force is False:
+        using = getRealShardConnectionName(using)
+
+    connections()[using].close()
+
+
 _djangoConfigToPsql = (
     ('NAME', 'dbname'),
     ('USER', 'user'),
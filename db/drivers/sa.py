@@ -136,6 +136,107 @@ def db_exec(sql, args=None, using='default', force=False, debug=False):
         #ScopedSessions[using]().execute(sql, args)
 
 
+def db_exec_raw(sql, using='default', force=False, debug=False):
+    """
+    Execute SQL verbatim on the requested database connection, without any parameter interpolation (so literal `%`
+    characters need no escaping).
+
+    @param force boolean Defaults to False. Whether or not to force the named connection to be used.
+    """
+    from ..import DEBUG
+
+    try:
+        from app import ScopedSessions
+    except ImportError:
+        from src.app import ScopedSessions
+
+    if force is False:
+        using = getRealShardConnectionName(using)
+
+    if DEBUG is True or debug is True:
+        logging.info(u'-- [DEBUG] DB_EXEC_RAW, using={0} ::\n{1}'.format(using, sql))
+
+    # `text()` would treat `:name` as a bind and double up `%`, so drop down to the raw DBAPI connection backing the
+    # session's transaction.  psycopg2 only interpolates when params are given.
+    cursor = ScopedSessions[using]().connection().connection.cursor()
+    cursor.execute(sql)
+
+    cursor.close()
+
+
+def db_copy(sql, file, using='default', force=False, debug=False):
+    """
+    Execute a `COPY ... TO STDOUT` or `COPY ... FROM STDIN` statement, streaming the data to/from a file-like object.
+
+    @param file File-like object to write the data to (TO STDOUT) or read the data from (FROM STDIN).
+    @param force boolean Defaults to False. Whether or not to force the named connection to be used.
+    """
+    from ..import DEBUG
+
+    try:
+        from app import ScopedSessions
+    except ImportError:
+        from src.app import ScopedSessions
+
+    if force is False:
+        using = getRealShardConnectionName(using)
+
+    if DEBUG is True or debug is True:
+        logging.info(u'-- [DEBUG] DB_COPY, using={0} ::\n{1}'.format(using, sql))
+
+    # COPY isn't exposed by SqlAlchemy, so drop down to the raw DBAPI connection backing the session's transaction.
+    cursor = ScopedSessions[using]().connection().connection.cursor()
+    cursor.copy_expert(sql, file)
+
+    cursor.close()
+
+
+def dbapiConnection(using='default', force=False):
+    """
+    Get the underlying psycopg2 connection backing the invoking thread's scoped session for a connection name.  The
+    same object is returned for as long as the database session lasts.
+
+    @param force boolean Defaults to False. Whether or not to force the named connection to be used.
+    """
+    try:
+        from app import ScopedSessions
+    except ImportError:
+        from src.app import ScopedSessions
+
+    if force is False:
+        using = getRealShardConnectionName(using)
+
+    # NB: The pool hands out a new proxy for every checkout, so unwrap it down to the DBAPI connection itself.
+    return ScopedSessions[using]().connection().connection.connection
+
+
+def isInTransaction(using='default', force=False):
+    """
+    Check whether the invoking thread's scoped session may have a transaction open.  Always True, as rolling back a
+    session which hasn't begun a transaction doesn't involve the database anyways.
+
+    @param force boolean Defaults to False. Whether or not to force the named connection to be used.
+    """
+    return True
+
+
+def closeConnection(using='default', force=False):
+    """
+    Release the invoking thread's scoped session for a connection.
+
+    @param force boolean Defaults to False. Whether or not to force the named connection to be used.
+    """
+    try:
+        from app import ScopedSessions
+    except ImportError:
+        from src.app import ScopedSessions
+
+    if force is False:
+        using = getRealShardConnectionName(using)
+
+    ScopedSessions[using].remove()
+
+
 _saAttrsToPsql = (
     ('database', 'dbname', 'sendhub'),
     ('username', 'user', None),
@@ -9,6 +9,28 @@ import logging
 from ..functional import memoize
 
 
+def clearReflectionCache():
+    """
+    Forget all memoized reflection results.  Invoke after DDL, otherwise the old schema will continue to be reported
+    for the life of the process.
+    """
+    for fn in (
+        allTableNamesAndPrimaryKeys,
+        getPrimaryKeyColumns,
+        plFunctionReturnType,
+        isNullable,
+        describePublic,
+        describe,
+        listTables,
+        findTablesWithUserIdColumn,
+        discoverDependencies,
+        allTableRelations,
+        referencesTables,
+        referencedByTables,
+    ):
+        fn.clear()
+
+
 @memoize
 def allTableNamesAndPrimaryKeys(using='default'):
     """@return dict of table names and lists of pks."""
@@ -92,9 +114,10 @@ def isNullable(table, column, using='default'):
     '''.format(table.replace('"', ''), column.replace("'", ''))
 
     result = db_query(sql, using=using)
+    nullable = len(result) > 0 and result[0][0] == 'YES'
 
-    logging.info(u'ISNULLABLE: {0} {1} => {2}'.format(table, column, len(result) > 0 and result[0][0] == 'YES'))
-    return len(result) > 0 and result[0][0] == 'YES'
+    logging.info(u'ISNULLABLE: %s %s => %s', table, column, nullable)
+    return nullable
 
 
 @memoize
@@ -138,8 +161,8 @@ def describePublic(using='default'):
 
 @memoize
 def describe(table, using='default'):
-    """Describe a table's columns/types."""
-    return describePublic().get(table, [])
+    """Describe a table's columns/types, looked up in the single memoized `describePublic()` catalog query."""
+    return describePublic(using=using).get(table, [])
     #from . import db_query
     #sql = '''
     #    SELECT
@@ -280,14 +303,14 @@ def discoverDependencies(tables, using='default', discovered=None):
         discovered = {}
 
     for table in tables:
-        related = filter(lambda ref: ref[0] not in tables, referencedByTables(table))
+        related = filter(lambda ref: ref[0] not in tables, referencedByTables(table, using=using))
 
         if len(related) > 0:
             discovered[table] = list(discovered.get(table, []))
 
             startLength = len(discovered[table])
 
-            map(discovered[table].append, related)
+            discovered[table].extend(related)
 
             discovered[table] = set(discovered[table])
 
@@ -323,7 +346,7 @@ def allTableRelations(using='default'):
         ORDER BY "tc"."table_name" ASC
     '''
 
-    rows = db_query(sql)
+    rows = db_query(sql, using=using)
 
     references = {}
     referencedBy = {}
@@ -55,8 +55,12 @@ def select2insert(table, description, whereClause=None):
     return intermediateSql
 
 
-def select2multiInsert(using, table, description, whereClause=None):
-    """Evaluates intermediate SQL and returns combined multi-insert statement."""
+def select2multiInsert(using, table, description, whereClause=None, args=None):
+    """
+    Evaluates intermediate SQL and returns combined multi-insert statement.
+
+    @param args tuple Optional parameters to bind for the whereClause.
+    """
     from . import db_query
 
     values = " || ',' || ".join(map(lambda tup: 'quote_nullable("{0}")'.format(tup[0]), description))
@@ -69,7 +73,7 @@ def select2multiInsert(using, table, description, whereClause=None):
     intermediateSql = \
         u'''SELECT '(' || {values} || ')' FROM "{table}"{where};'''.format(values=values, table=table, where=where)
 
-    actualValues = ','.join(map(lambda tup: tup[0], db_query(intermediateSql, using=using)))
+    actualValues = ','.join(map(lambda tup: tup[0], db_query(intermediateSql, args, using=using)))
     if len(actualValues) == 0:
         return None
 
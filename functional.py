@@ -69,9 +69,12 @@ def memoize(fn):
             self.f = f
             self._cached = {}
 
-            # Determine whether or not the function accepts keyword arguments.
+            # Determine whether or not the function accepts arbitrary keyword arguments, otherwise only its named
+            # arguments can be forwarded as keywords.
             # NB: getargspec return format is: args, varargs, varkw, defaults
-            self._acceptsKw = getargspec(self.f)[2] is not None
+            argSpec = getargspec(self.f)
+            self._acceptsKw = argSpec[2] is not None
+            self._argNames = frozenset(argSpec[0])
 
         def __call__(self, *args, **kw):
             """Generate the unique key and rtrieve the memoized result."""
@@ -101,13 +104,17 @@ def memoize(fn):
             #print 'key=%s' % key
 
             if key not in self._cached:
-                self._cached[key] = self.f(*args, **kw) \
-                    if self._acceptsKw is True else self.f(*args)
+                self._cached[key] = self.f(*args, **kw) if self._acceptsKw is True \
+                    else self.f(*args, **dict((k, v) for k, v in kw.items() if k in self._argNames))
 
             # Return a copy because we don't want the invoker to then modify the
             # result that will be returned forever.
             return deepcopy(self._cached[key])
 
+        def clear(self):
+            """Forget all memoized results."""
+            self._cached.clear()
+
     return Memoize(fn)
 
 
@@ -41,7 +41,9 @@ def uploadFile(destinationFilePath, data, contentType='plain/text', policy='priv
         method = key.set_contents_from_string
     else:
         method = key.set_contents_from_file
-        data = BytesIO(data.read()) if hasattr(data, 'read') and callable(data.read) else BytesIO(data)
+        # Seekable files are uploaded as-is (boto needs to rewind them), rather than read into memory.
+        if not (hasattr(data, 'read') and hasattr(data, 'seek')):
+            data = BytesIO(data.read()) if hasattr(data, 'read') and callable(data.read) else BytesIO(data)
 
     destinationFilePath = _fileNameCleanerRe.sub('', destinationFilePath)
 